@@ -3,9 +3,11 @@
 """
 
 from .color import *
+from .draw import *
 from .geom import *
 from .main import *
 from .param import *
 from .point import *
+from .raster import *
 from .shapes import *
 from .svg import *
@@ -9,7 +9,7 @@ import numpy as np
 import colorsys
 from typing import Sequence, Tuple, Union
 
-from .param import fixed_value, make_param
+from .param import fixed_value, make_param, clone
 
 
 class Color:
@@ -51,6 +51,10 @@ class Color:
     def __str__(self):
         return "Color({}, {}, {})".format(self.hue, self.sat, self.li)
 
+    def clone(self):
+        """Get a copy that is evaluated independently (see ``clone``)."""
+        return clone(self)
+
     def hsl(self, t: int = 0) -> Tuple[float, float, float]:
         """Get the color's hsl specification.
 
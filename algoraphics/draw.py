@@ -0,0 +1,437 @@
+"""
+draw.py
+=======
+Render shapes directly with cairo, without generating SVG.
+
+This is used by canvases whose backend is ``"cairo"``.  It requires
+the cairo library and either cairocffi or pycairo.
+
+"""
+
+import io
+import sys
+import numpy as np
+from typing import Union, Tuple, Sequence, Callable
+
+from . import svg
+from .main import flatten
+from .param import fixed_value
+from .raster import _unpremultiply
+from .shapes import (
+    Polygon,
+    Spline,
+    Line,
+    Circle,
+    Group,
+    ShapeArray,
+    CircleArray,
+    PolygonArray,
+    LineArray,
+    bounding_box,
+)
+
+Pnt = Tuple[float, float]
+Bounds = Tuple[float, float, float, float]
+
+# Position of the alpha byte in cairo's native-endian ARGB pixels:
+_alpha_index = 3 if sys.byteorder == "little" else 0
+
+_colors = {}
+
+
+def _cairo():
+    """Import a cairo binding, preferring cairocffi."""
+    try:
+        import cairocffi as cairo
+    except (ImportError, OSError):
+        import cairo
+    return cairo
+
+
+def _rgba(color: str, opacity: float = 1) -> Tuple[float, float, float, float]:
+    """Convert a CSS color to RGBA values between 0 and 1."""
+    rgba = _colors.get(color)
+    if rgba is None:
+        from PIL import ImageColor
+
+        rgba = tuple([x / 255 for x in ImageColor.getcolor(color, "RGBA")])
+        _colors[color] = rgba
+    return rgba[:3] + (rgba[3] * opacity,)
+
+
+def _parse_style(css: str) -> dict:
+    """Split a compiled style into a dict of properties."""
+    return dict([prop.split(":", 1) for prop in css.split(";") if prop != ""])
+
+
+def _trace(ctx, shape: dict, t: int = 0, i: int = None) -> bool:
+    """Add a shape's outline to the current path.
+
+    Args:
+        i: For a shape array, the index of the shape to trace.
+
+    Returns:
+        False if the shape has nothing to draw.
+
+    """
+    if isinstance(shape, ShapeArray):
+        return _trace_element(ctx, shape, i)
+    if type(shape) is Circle:
+        c = shape.c.state(t)
+        r = fixed_value(shape.r, t)
+        if r <= 0:
+            return False
+        ctx.new_sub_path()
+        ctx.arc(c[0], c[1], r, 0, 2 * np.pi)
+        return True
+
+    pts = [pt.state(t) for pt in shape.points]
+    if type(shape) is Spline:
+        if len(pts) < 2:
+            return False
+        start, segments = _spline_segments(pts, shape.smoothing, shape.circular)
+        ctx.move_to(*start)
+        for segment in segments.tolist():
+            ctx.curve_to(*segment)
+    else:
+        if len(pts) == 0:
+            return False
+        ctx.move_to(*pts[0])
+        for x, y in pts[1:]:
+            ctx.line_to(x, y)
+        if type(shape) is Polygon:
+            ctx.close_path()
+    return True
+
+
+def _spline_segments(
+    points: Sequence[Pnt], smoothing: float = 0.3, circular: bool = False
+) -> Tuple[Pnt, np.ndarray]:
+    """Get the cubic bezier curves of a spline.
+
+    Returns:
+        The starting point, and an n x 6 array with each curve's two
+        control points and endpoint, as passed to ``curve_to``.
+
+    """
+    start, c1, curves = svg._spline_controls(points, smoothing, circular)
+    # Each curve's first control point reflects the previous one's second:
+    firsts = np.vstack([c1, 2 * curves[:-1, 1] - curves[:-1, 0]])
+    return start, np.hstack([firsts, curves[:, 0], curves[:, 1]])
+
+
+def _stroke(props: dict) -> Union[dict, None]:
+    """Get the stroke settings of compiled style properties.
+
+    Returns:
+        A dict with the stroke's RGBA color, width, line cap and line
+        join names, miter limit, and dash lengths, or None if the shape
+        isn't stroked.
+
+    """
+    stroke = props.get("stroke", "none")
+    width = float(props.get("stroke-width", 1))
+    if stroke == "none" or width <= 0:
+        return None
+    dashes = props.get("stroke-dasharray", "none")
+    dashes = [] if dashes == "none" else dashes.replace(",", " ").split()
+    return dict(
+        rgba=_rgba(stroke, float(props.get("stroke-opacity", 1))),
+        width=width,
+        cap=props.get("stroke-linecap", "butt"),
+        join=props.get("stroke-linejoin", "miter"),
+        miter_limit=float(props.get("stroke-miterlimit", 4)),
+        dashes=[float(x) for x in dashes],
+    )
+
+
+def _paint(ctx, cairo, props: dict, fill: str):
+    """Fill and stroke the current path according to style properties."""
+    if fill != "none":
+        ctx.set_source_rgba(*_rgba(fill, float(props.get("fill-opacity", 1))))
+        if props.get("fill-rule") == "evenodd":
+            ctx.set_fill_rule(cairo.FILL_RULE_EVEN_ODD)
+        else:
+            ctx.set_fill_rule(cairo.FILL_RULE_WINDING)
+        ctx.fill_preserve()
+    stroke = _stroke(props)
+    if stroke is not None:
+        ctx.set_source_rgba(*stroke["rgba"])
+        ctx.set_line_width(stroke["width"])
+        ctx.set_line_cap(getattr(cairo, "LINE_CAP_" + stroke["cap"].upper()))
+        ctx.set_line_join(getattr(cairo, "LINE_JOIN_" + stroke["join"].upper()))
+        ctx.set_miter_limit(stroke["miter_limit"])
+        ctx.set_dash(stroke["dashes"])
+        ctx.stroke_preserve()
+    ctx.new_path()
+
+
+def _trace_element(ctx, shape: ShapeArray, i: int) -> bool:
+    """Add the outline of one shape in a shape array to the current path.
+
+    Returns:
+        False if the shape has nothing to draw.
+
+    """
+    if type(shape) is CircleArray:
+        (x, y), r = shape.centers[i].tolist(), float(shape.radii[i])
+        if r <= 0:
+            return False
+        ctx.new_sub_path()
+        ctx.arc(x, y, r, 0, 2 * np.pi)
+        return True
+    pts = shape.vertices[shape.offsets[i] : shape.offsets[i + 1]].tolist()
+    if len(pts) == 0:
+        return False
+    ctx.move_to(*pts[0])
+    for x, y in pts[1:]:
+        ctx.line_to(x, y)
+    if type(shape) is PolygonArray:
+        ctx.close_path()
+    return True
+
+
+def _elements(shape: dict) -> Sequence[int]:
+    """Get the indices to trace a shape by (see ``_trace``)."""
+    return range(len(shape)) if isinstance(shape, ShapeArray) else [None]
+
+
+def _draw_shape(ctx, cairo, shape: dict, t: int = 0):
+    """Draw a shape, shape array, or group onto a cairo context."""
+    if type(shape) is Group:
+        _draw_group(ctx, cairo, shape, t)
+        return
+    if isinstance(shape, ShapeArray):
+        styles = svg._array_styles(shape, t)
+    else:
+        styles = [svg._write_style(shape, t)]
+    # Polylines are unfilled unless their style says otherwise.
+    unfilled = "none" if type(shape) in (Line, LineArray) else "black"
+    parsed = {}
+    for i, css in zip(_elements(shape), styles):
+        props = parsed.get(css)
+        if props is None:
+            props = _parse_style(css)
+            parsed[css] = props
+        opacity = float(props.get("opacity", 1))
+        if opacity < 1:
+            ctx.push_group()
+        if _trace(ctx, shape, t, i):
+            _paint(ctx, cairo, props, props.get("fill", unfilled))
+        if opacity < 1:
+            ctx.pop_group_to_source()
+            ctx.paint_with_alpha(opacity)
+
+
+def _draw_group(ctx, cairo, group: Group, t: int = 0):
+    """Draw a group, applying its filter and then its clip, as in SVG."""
+    if len(group.clip) > 0:
+        # Clip shapes are combined as a mask, so their union is used
+        # regardless of their orientation.
+        ctx.push_group()
+        for shape in _clip_shapes(group.clip):
+            for i in _elements(shape):
+                if _trace(ctx, shape, t, i):
+                    ctx.set_source_rgba(0, 0, 0, 1)
+                    ctx.fill()
+        mask = ctx.pop_group()
+        ctx.push_group()
+    if group.filter is not None:
+        _draw_filtered(ctx, cairo, flatten(group.members), group.filter, t)
+    else:
+        for shape in flatten(group.members):
+            _draw_shape(ctx, cairo, shape, t)
+    if len(group.clip) > 0:
+        ctx.pop_group_to_source()
+        ctx.mask(mask)
+
+
+def _clip_shapes(clip: list) -> list:
+    """Get the shapes in a clip, including those in groups.
+
+    Lines are left out, since they enclose no area in SVG clip paths.
+
+    """
+    shapes = []
+    for shape in flatten(clip):
+        if type(shape) is Group:
+            shapes.extend(_clip_shapes(shape.members))
+        elif type(shape) not in (Line, LineArray):
+            shapes.append(shape)
+    return shapes
+
+
+def _draw_filtered(ctx, cairo, shapes: list, fltr: dict, t: int = 0):
+    """Draw shapes with a filter applied to them together.
+
+    As in SVG, the filter's input and output are limited to the filter
+    region, which extends the shapes' bounding box by half its width
+    and height on each side.  Only the part of the region within the
+    target surface is rendered and filtered.
+
+    """
+    if len(shapes) == 0:
+        return
+    target = ctx.get_target()
+    width, height = target.get_width(), target.get_height()
+    region = _filter_region(bounding_box(shapes, t), ctx.user_to_device, width, height)
+    if region is None:
+        return
+    left, top, right, bottom = region
+    content = cairo.ImageSurface(cairo.FORMAT_ARGB32, right - left, bottom - top)
+    content_ctx = cairo.Context(content)
+    content_ctx.translate(-left, -top)
+    content_ctx.transform(ctx.get_matrix())
+    for shape in shapes:
+        _draw_shape(content_ctx, cairo, shape, t)
+    content.flush()
+    ctx.save()
+    ctx.identity_matrix()
+    ctx.rectangle(left, top, right - left, bottom - top)
+    ctx.clip()
+    if fltr["type"] == "shadow":
+        shadow = _shadow(ctx, cairo, content, fltr)
+        ctx.set_source_surface(shadow, left, top)
+        ctx.paint()
+        shadow.finish()
+    ctx.set_source_surface(content, left, top)
+    ctx.paint()
+    ctx.restore()
+
+
+def _filter_region(
+    bounds: Bounds, to_device: Callable, width: int, height: int
+) -> Union[Tuple[int, int, int, int], None]:
+    """Find the pixels of a target surface covered by a filter region.
+
+    Args:
+        bounds: The filtered shapes' bounding box.
+        to_device: A function converting a point to device
+          coordinates, such as a cairo context's ``user_to_device``.
+        width: The width of the target surface in pixels.
+        height: The height of the target surface in pixels.
+
+    Returns:
+        The left, top, right, and bottom edges of the region in
+        pixels, or None if it doesn't overlap the target.
+
+    """
+    x0, y0, x1, y1 = bounds
+    dx, dy = (x1 - x0) / 2, (y1 - y0) / 2
+    corners = [to_device(x, y) for x in (x0 - dx, x1 + dx) for y in (y0 - dy, y1 + dy)]
+    xs, ys = zip(*corners)
+    left, top = max(0, int(np.floor(min(xs)))), max(0, int(np.floor(min(ys))))
+    right = min(width, int(np.ceil(max(xs))))
+    bottom = min(height, int(np.ceil(max(ys))))
+    if right <= left or bottom <= top:
+        return None
+    return left, top, right, bottom
+
+
+def _shadow(ctx, cairo, content, fltr: dict):
+    """Get the blurred, darkened silhouette of a rendered surface.
+
+    The blur's standard deviation is scaled from canvas units by the
+    transformation of ``ctx``.
+
+    """
+    from scipy.ndimage import gaussian_filter
+
+    height, width = content.get_height(), content.get_width()
+    stride = content.get_stride()
+    pixels = np.frombuffer(content.get_data(), dtype=np.uint8)
+    alpha = pixels.reshape(height, stride)[:, _alpha_index : width * 4 : 4]
+    xx, yx = ctx.user_to_device_distance(1, 0)
+    xy, yy = ctx.user_to_device_distance(0, 1)
+    sigma = fltr["stdev"] * np.sqrt(abs(xx * yy - xy * yx))
+    blurred = gaussian_filter(alpha.astype(np.float32), sigma, mode="constant")
+    shadow = np.zeros((height, stride), dtype=np.uint8)
+    # SVG renderers clamp flood-opacity to [0, 1]:
+    darkness = min(max(fltr["darkness"], 0), 1)
+    # Black, so the premultiplied color channels are zero:
+    shadow[:, _alpha_index : width * 4 : 4] = np.clip(
+        np.round(blurred * darkness), 0, 255
+    )
+    return cairo.ImageSurface.create_for_data(
+        memoryview(shadow), cairo.FORMAT_ARGB32, width, height, stride
+    )
+
+
+def _canvas_matrix(h: float, scale: float = 1) -> Tuple[float, ...]:
+    """Get the transformation from canvas to pixel coordinates.
+
+    The y-axis is flipped so zero is at the bottom, as in SVG output.
+
+    Returns:
+        The matrix components (xx, yx, xy, yy, x0, y0), in the order
+        taken by ``cairo.Matrix``.
+
+    """
+    return (scale, 0.0, 0.0, -scale, 0.0, h * scale)
+
+
+def _surface(objects: Union[list, dict], w: float, h: float, t: int = 0, scale: float = 1):
+    """Draw objects onto a new cairo image surface."""
+    cairo = _cairo()
+    width = max(1, int(round(w * scale)))
+    height = max(1, int(round(h * scale)))
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+    ctx = cairo.Context(surface)
+    ctx.transform(cairo.Matrix(*_canvas_matrix(h, scale)))
+    for obj in flatten(objects):
+        _draw_shape(ctx, cairo, obj, t)
+    surface.flush()
+    return surface
+
+
+def draw_array(
+    objects: Union[list, dict],
+    w: float,
+    h: float,
+    t: int = 0,
+    scale: float = 1,
+    dtype: type = np.uint8,
+) -> np.ndarray:
+    """Draw objects with cairo and get the pixels as an array.
+
+    Args:
+        objects: A (nested) collection of objects.  They are drawn in
+          order after flattening.
+        w: Width of the canvas.
+        h: Height of the canvas.
+        t: If objects are dynamic, the timepoint to render.
+        scale: Factor by which to scale the output dimensions.
+        dtype: The type of the output values.  Integer arrays hold
+          values from 0 to 255, and float arrays from 0 to 1.
+
+    Returns:
+        A height x width x 4 array of RGBA values.
+
+    """
+    surface = _surface(objects, w, h, t, scale)
+    height, width = surface.get_height(), surface.get_width()
+    pixels = np.frombuffer(surface.get_data(), dtype=np.uint8)
+    pixels = pixels.reshape(height, surface.get_stride())[:, : width * 4]
+    return _unpremultiply(pixels.reshape(height, width, 4), dtype)
+
+
+def draw_png(
+    objects: Union[list, dict], w: float, h: float, t: int = 0, scale: float = 1
+) -> bytes:
+    """Draw objects with cairo and get the image as PNG data.
+
+    Args:
+        objects: A (nested) collection of objects.  They are drawn in
+          order after flattening.
+        w: Width of the canvas.
+        h: Height of the canvas.
+        t: If objects are dynamic, the timepoint to render.
+        scale: Factor by which to scale the output dimensions.
+
+    Returns:
+        The PNG file contents.
+
+    """
+    f = io.BytesIO()
+    _surface(objects, w, h, t, scale).write_to_png(f)
+    return f.getvalue()
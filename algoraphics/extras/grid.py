@@ -6,9 +6,6 @@ Functions for working with grids.
 """
 
 import numpy as np
-import matplotlib.colors
-from scipy.sparse import csr_matrix
-from scipy.sparse.csgraph import minimum_spanning_tree, shortest_path
 from typing import Sequence, Tuple
 
 from ..color import Color, make_color
@@ -23,6 +20,8 @@ def rgb_array_to_hsv(rgb: np.ndarray) -> np.ndarray:
     Returns:
         An array of HSV colors.
     """
+    import matplotlib.colors
+
     return matplotlib.colors.rgb_to_hsv(rgb)
 
 
@@ -35,6 +34,8 @@ def hsv_array_to_rgb(hsv: np.ndarray) -> np.ndarray:
     Returns:
         An array of rgb colors.
     """
+    import matplotlib.colors
+
     return matplotlib.colors.hsv_to_rgb(hsv)
 
 
@@ -105,6 +106,9 @@ def grid_tree(rows: int, cols: int) -> np.ndarray:
         cells x num. grid cells) indicating which cells are connected.
 
     """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import minimum_spanning_tree
+
     right_edges = [((r, c), (r, c + 1)) for r in range(rows) for c in range(cols - 1)]
     up_edges = [((r, c), (r + 1, c)) for r in range(rows - 1) for c in range(cols)]
     node1, node2 = tuple(zip(*(right_edges + up_edges)))
@@ -177,6 +181,8 @@ def grid_tree_dists(rows: int, cols: int) -> np.ndarray:
         A 2D array of integers.
 
     """
+    from scipy.sparse.csgraph import shortest_path
+
     tree_mat = grid_tree(rows, cols)
     dists = shortest_path(tree_mat, directed=False, unweighted=True, indices=0)
     return np.reshape(dists, (rows, cols))
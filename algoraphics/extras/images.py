@@ -6,9 +6,6 @@ Generate graphics based on images.
 """
 
 import numpy as np
-from PIL import Image
-from skimage.measure import find_contours, approximate_polygon
-from skimage.segmentation import slic, find_boundaries
 from typing import Union, Tuple, Sequence
 
 from ..shapes import sample_points_in_shape, centroid, Spline, set_style
@@ -29,6 +26,8 @@ def open_image(path: str) -> "Image":
         A PIL Image.
 
     """
+    from PIL import Image
+
     image = Image.open(path).transpose(Image.FLIP_TOP_BOTTOM)
     return image.convert("RGB")  # Remove transparency coordinate from PNGs.
 
@@ -140,6 +139,8 @@ def _segment_image(
         A 2D array of integer segment labels.
 
     """
+    from skimage.segmentation import slic
+
     return slic(
         np.array(image), n_segments, compactness, sigma=smoothness, min_size_factor=0.1
     )
@@ -191,6 +192,9 @@ def _segments_to_shapes(
         and then bottom to top.
 
     """
+    from skimage.measure import find_contours, approximate_polygon
+    from skimage.segmentation import find_boundaries
+
     shapes = []
     for label in np.unique(seg):
         region = seg == label
@@ -6,7 +6,6 @@ Functions for creating maze-like patterns.
 """
 
 import numpy as np
-import copy
 from typing import Sequence, Tuple, Union
 
 from ..main import add_margin
@@ -19,6 +18,7 @@ from ..shapes import (
     Spline,
     Group,
 )
+from ..param import clone
 from ..geom import rotate_points, translate_points, scale_points, rad, deg
 from .grid import grid_tree_neighbors
 from .utils import points_on_line, points_on_arc
@@ -32,7 +32,7 @@ Collection = Union[list, Shape, Group]
 
 def _rotated_piece(path: Sequence[dict], times: int) -> Sequence[dict]:
     """Get a rotated copy of a maze piece."""
-    path = copy.deepcopy(path)
+    path = clone(path)
     _rotate_cell(path, times)
     return path
 
@@ -18,7 +18,7 @@ from ..geom import (
     jittered_points,
 )
 from ..shapes import Polygon, Spline, Line
-from ..param import Param, fixed_value, make_param
+from ..param import Param, fixed_value, make_param, clone
 from ..point import Point, Move, make_point
 from .utils import is_clockwise, interpolate
 
@@ -291,8 +291,8 @@ def tree(
     """
     start = make_point(start)
     direction = make_param(direction)
-    branch_length = copy.deepcopy(make_param(branch_length))
-    theta = copy.deepcopy(make_param(theta))
+    branch_length = clone(make_param(branch_length))
+    theta = clone(make_param(theta))
     p = fixed_value(p)
 
     end = Move(start, direction, branch_length)
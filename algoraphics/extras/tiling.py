@@ -6,8 +6,6 @@ Fill a region or the canvas with tiles or webs.
 """
 
 import numpy as np
-from scipy import spatial
-from copy import deepcopy
 from typing import Union, Tuple, List, Sequence
 
 from ..main import add_margin, bounding_box, region_background
@@ -23,6 +21,7 @@ from ..shapes import (
 )
 from ..geom import midpoint
 from ..color import Color
+from ..param import clone
 from .utils import spaced_points
 
 # Number = Union[int, float]
@@ -45,6 +44,8 @@ def voronoi_regions(points: Sequence[Pnt]) -> List[dict]:
         regions.
 
     """
+    from scipy import spatial
+
     vor = spatial.Voronoi(np.array(points))
     regions = [
         [tuple(vor.vertices[i]) for i in region]
@@ -67,6 +68,8 @@ def voronoi_edges(points: Sequence[Pnt]) -> List[dict]:
         A list of line shapes.
 
     """
+    from scipy import spatial
+
     vor = spatial.Voronoi(np.array(points))
     edges = [
         [tuple(vor.vertices[i]) for i in edge]
@@ -88,6 +91,7 @@ def delaunay_regions(points: Sequence[Pnt]) -> List[dict]:
         finite regions.
 
     """
+    from scipy import spatial
 
     tri = spatial.Delaunay(np.array(points))
     regions = [[points[i] for i in region] for region in tri.simplices]
@@ -107,6 +111,8 @@ def delaunay_edges(points: Sequence[Pnt]) -> List[dict]:
         A list of line shapes.
 
     """
+    from scipy import spatial
+
     tri = spatial.Delaunay(np.array(points))
     edges = []
     for simplex in tri.simplices:
@@ -272,7 +278,7 @@ def fill_nested_triangles(
     region = Group(clip=outline, members=triangles)
     if color is not None:
         for tri in region.members:
-            set_style(tri, "fill", deepcopy(color))
+            set_style(tri, "fill", clone(color))
     if color2 is not None:
         region_background(region, color2)
     return region
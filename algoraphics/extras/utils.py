@@ -5,13 +5,13 @@ Functions used in the extras library.
 
 """
 
+import math
 import numpy as np
-import rtree
 from typing import Dict, List, Union, Tuple, Sequence
 
 from ..color import Color, make_color
 from ..geom import distance, jitter_points, endpoint, rad
-from ..shapes import Shape, Group, Polygon, Spline, Line, Circle
+from ..shapes import Shape, Group, Polygon, Spline, Line, Circle, _modified
 
 Pnt = Tuple[float, float]
 Bounds = Tuple[float, float, float, float]
@@ -69,6 +69,8 @@ class Rtree:
     """
 
     def __init__(self, points: Sequence[Pnt] = None):
+        import rtree
+
         if points is None:
             points = []
         self.idx = rtree.index.Index()
@@ -280,6 +282,7 @@ def wobble(shapes: Sequence, dev: float = 2):
           move.
 
     """
+    _modified()
     for i, obj in enumerate(shapes):
         if type(obj) is list:
             wobble(obj, dev)
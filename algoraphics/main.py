@@ -9,7 +9,7 @@ import numpy as np
 from typing import Union, Any, Sequence, Tuple
 
 from .geom import distance
-from .shapes import rectangle, bounding_box, Shape, Group
+from .shapes import rectangle, bounding_box, Shape, Group, _modified
 from .color import Color
 
 # Number = Union[int, float]
@@ -71,6 +71,7 @@ def reorder_objects(
         h: Canvas height, used to get center when by='out to in'.
 
     """
+    _modified()
     if by == "random":
         np.random.shuffle(objects)
 
@@ -122,6 +123,7 @@ def region_background(region: dict, color: Color):
         color: A color to apply to the region.
 
     """
+    _modified()
     bounds = add_margin(bounding_box(region.clip), 10)
     bg = rectangle(bounds=bounds, fill=color)
     region.members.insert(0, bg)
@@ -143,6 +145,7 @@ def add_shadows(
         darkness: A number below one for lighter shadow, above one for darker.
 
     """
+    _modified()
     for i, obj in enumerate(objects):
         obj = obj if isinstance(obj, list) else [obj]
         fltr = dict(type="shadow", stdev=stdev, darkness=darkness)
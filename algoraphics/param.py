@@ -6,7 +6,7 @@ Define parameter objects that incorporate randomness.
 """
 
 import numpy as np
-from typing import Union, Callable
+from typing import Union, Callable, Iterator
 
 
 class Param:
@@ -16,12 +16,24 @@ class Param:
     arbitrary functions.  For random distributions, use a specific
     class that inherits from ``Param``.
 
+    Random Params that change every frame (``static`` set to False)
+    get the value for each timepoint by hashing a random key of the
+    Param with the timepoint, so timepoints can be evaluated in any
+    order and give the same values when revisited.
+    Params defined by a function call it again for each evaluation.
+
     Args:
         x: A value, list, or a function that takes no arguments and
           returns a value.
 
     """
 
+    # Values stored for rendering (see ``_precomputed``), from
+    # timepoint ``_series_t0`` up to ``_series_end``:
+    _series = np.empty(0)
+    _series_t0 = 0
+    _series_end = 0
+
     def __init__(self, x: Union[str, float, list, Callable], static: bool = True):
         if type(x) is list:
             self.choices = x
@@ -42,6 +54,7 @@ class Param:
         #     self.mean = x
         self.static = static
         self.t_prev = -1
+        self._key = None
 
     def __add__(self, other):
         return Sum(self, other)
@@ -67,6 +80,10 @@ class Param:
     def __rtruediv__(self, other):
         return Quotient(other, self)
 
+    def clone(self):
+        """Get a copy that is evaluated independently (see ``clone``)."""
+        return clone(self)
+
     # def values(self, n):
     #     return [self.value() for i in range(n)]
 
@@ -79,15 +96,154 @@ class Param:
     #         self.t_prev = t
     #         return self.value
     def state(self, t: int = 0):
-        if (t > self.t_prev) and (t == 0 or not self.static):
-            assert t == self.t_prev + 1
-            if self.choices is not None:
-                self.value = np.random.choice(self.choices)
-            elif self.function is not None:
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
+        if (t != self.t_prev) and (self.t_prev == -1 or not self.static):
+            if self.function is not None:
                 self.value = self.function()
-            self.t_prev = t
+            elif not self.static:
+                self.value = self._keyed_value(t)
+            elif self.choices is not None:
+                self.value = np.random.choice(self.choices)
+            # Static values hold from t = 0.
+            self.t_prev = 0 if self.static else t
+        return self.value
+
+    def sample(self, n: int, memo: dict = None) -> np.ndarray:
+        """Draw independent values all at once.
+
+        The values are distributed like those of ``n`` copies of the
+        Param evaluated at t = 0.
+
+        Args:
+            n: The number of values.
+            memo: A dict of values already drawn, keyed by Param id,
+              so that a Param used more than once in an expression
+              has the same values each time.
+
+        Returns:
+            An array of length ``n``.
+
+        """
+        memo = {} if memo is None else memo
+        if id(self) not in memo:
+            memo[id(self)] = self._sample(n, memo)
+        return memo[id(self)]
+
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        """Draw values for ``sample``."""
+        if self.choices is not None:
+            return np.random.choice(self.choices, n)
+        elif self.function is not None:
+            return np.array([self.function() for i in range(n)])
+        else:
+            return np.full(n, self.value)
+
+    def series(self, n: int) -> np.ndarray:
+        """Compute the values for a number of timepoints at once.
+
+        Child Params are computed as whole arrays and combined, rather
+        than evaluating the tree one timepoint at a time.  The values
+        are the same as those returned by ``state``.
+
+        A ``Dynamic`` walk is computed as a cumulative sum or product
+        until it first reaches its ``min`` or ``max``, after which it
+        is computed one timepoint at a time, because each clipped value
+        changes the rest of the walk.
+
+        Args:
+            n: The number of timepoints, starting at t = 0.
+
+        Returns:
+            An array of the values for t = 0 through ``n`` - 1.
+
+        """
+        return self._span(0, n, {})
+
+    def _recall(self, t: int):
+        """Get a stored value as the current state."""
+        self.value = self._series.item(t - self._series_t0)
+        self.t_prev = t
         return self.value
 
+    def _span(self, start: int, stop: int, memo: dict = None) -> np.ndarray:
+        """Get the values from one timepoint up to (not including) another.
+
+        Args:
+            memo: A dict of values already computed, keyed by Param
+              id and timepoints, so that Params shared between trees
+              are computed once.
+
+        """
+        if self._series_t0 <= start and stop <= self._series_end:
+            return self._series[start - self._series_t0 : stop - self._series_t0]
+        if memo is None:
+            return self._values(start, stop, memo)
+        key = (id(self), start, stop)
+        if key not in memo:
+            memo[key] = self._values(start, stop, memo)
+        return memo[key]
+
+    def _values(self, start: int, stop: int, memo: dict = None) -> np.ndarray:
+        """Compute the values for a range of timepoints (see ``_span``)."""
+        if self.function is not None and not self.static:
+            return np.array([self.function() for t in range(start, stop)])
+        if not self.static:
+            return self._keyed_values(start, stop)
+        return np.repeat([self.state(0)], stop - start)
+
+    def _keyed_value(self, t: int):
+        """Get the value of a Param that changes every frame."""
+        if self.choices is not None:
+            return self.choices[int(_uniform(self._random_key(), t) * len(self.choices))]
+        return self.value
+
+    def _keyed_values(self, start: int, stop: int) -> np.ndarray:
+        """Get the values of a Param that changes every frame."""
+        if self.choices is not None:
+            u = _uniforms(self._random_key(), np.arange(start, stop))
+            return np.array(self.choices)[(u * len(self.choices)).astype(int)]
+        return np.repeat([self.value], stop - start)
+
+    def _random_key(self) -> int:
+        """Get the key from which values that change every frame are hashed.
+
+        The key is drawn from ``np.random`` the first time it's needed.
+
+        """
+        if self._key is None:
+            self._key = int(np.random.random() * 2 ** 53)
+        return self._key
+
+
+# Constants of the SplitMix64 hash, which maps a Param's key and a
+# counter (from the timepoint) to a random 64-bit integer:
+_golden = 0x9E3779B97F4A7C15
+_mix1 = 0xBF58476D1CE4E5B9
+_mix2 = 0x94D049BB133111EB
+_mask = 2 ** 64 - 1
+
+
+def _uniform(key: int, i: int) -> float:
+    """Hash a key and counter to a number uniformly distributed in [0, 1).
+
+    This gives exactly the same values as ``_uniforms``, using Python
+    integers so that single values are cheap.
+
+    """
+    z = (key + (i + 1) * _golden) & _mask
+    z = ((z ^ (z >> 30)) * _mix1) & _mask
+    z = ((z ^ (z >> 27)) * _mix2) & _mask
+    return ((z ^ (z >> 31)) >> 11) * 2.0 ** -53
+
+
+def _uniforms(key: int, i: np.ndarray) -> np.ndarray:
+    """Hash a key with an array of counters (see ``_uniform``)."""
+    z = np.uint64(key) + (i.astype(np.uint64) + np.uint64(1)) * np.uint64(_golden)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(_mix1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(_mix2)
+    return ((z ^ (z >> np.uint64(31))) >> np.uint64(11)) * 2.0 ** -53
+
 
 class Uniform(Param):
     """Parameters with uniformly random distributions.
@@ -106,18 +262,35 @@ class Uniform(Param):
         self.static = static
         # self.mean = (min + max) / 2
         self.t_prev = -1
+        self._key = None
+        self.function = None
 
     # def value(self):
     #     """Generate a value."""
     #     return np.random.uniform(self.min, self.max)
 
     def state(self, t: int = 0):
-        if (t > self.t_prev) and (t == 0 or not self.static):
-            assert t == self.t_prev + 1
-            self.value = np.random.uniform(self.min, self.max)
-            self.t_prev = t
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
+        if (t != self.t_prev) and (self.t_prev == -1 or not self.static):
+            if self.static:
+                self.value = np.random.uniform(self.min, self.max)
+            else:
+                self.value = self._keyed_value(t)
+            # Static values hold from t = 0.
+            self.t_prev = 0 if self.static else t
         return self.value
 
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        return np.random.uniform(self.min, self.max, n)
+
+    def _keyed_value(self, t: int) -> float:
+        return self.min + _uniform(self._random_key(), t) * (self.max - self.min)
+
+    def _keyed_values(self, start: int, stop: int) -> np.ndarray:
+        u = _uniforms(self._random_key(), np.arange(start, stop))
+        return self.min + u * (self.max - self.min)
+
 
 class Normal(Param):
     """Parameters with Gaussian (normal) distributions.
@@ -133,18 +306,46 @@ class Normal(Param):
         self.stdev = stdev
         self.static = static
         self.t_prev = -1
+        self._key = None
+        self.function = None
 
     # def value(self):
     #     """Generate a value."""
     #     return np.random.normal(self.mean, self.stdev)
 
     def state(self, t: int = 0):
-        if (t > self.t_prev) and (t == 0 or not self.static):
-            assert t == self.t_prev + 1
-            self.value = np.random.normal(self.mean, self.stdev)
-            self.t_prev = t
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
+        if (t != self.t_prev) and (self.t_prev == -1 or not self.static):
+            if self.static:
+                self.value = np.random.normal(self.mean, self.stdev)
+            else:
+                self.value = self._keyed_value(t)
+            # Static values hold from t = 0.
+            self.t_prev = 0 if self.static else t
         return self.value
 
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        return np.random.normal(self.mean, self.stdev, n)
+
+    # Values that change every frame use the Box-Muller transform of two
+    # hashed uniform values.  The same numpy functions are used for one
+    # value as for an array so that the results are identical.
+
+    def _keyed_value(self, t: int) -> float:
+        key = self._random_key()
+        r = np.sqrt(-2.0 * np.log(1.0 - _uniform(key, 2 * t)))
+        z = float(r * np.cos(_tau * _uniform(key, 2 * t + 1)))
+        return self.mean + self.stdev * z
+
+    def _keyed_values(self, start: int, stop: int) -> np.ndarray:
+        key, i = self._random_key(), 2 * np.arange(start, stop)
+        r = np.sqrt(-2.0 * np.log(1.0 - _uniforms(key, i)))
+        return self.mean + self.stdev * (r * np.cos(_tau * _uniforms(key, i + 1)))
+
+
+_tau = 2 * np.pi
+
 
 class Exponential(Param):
     """Parameters with Exponential distributions.
@@ -161,6 +362,8 @@ class Exponential(Param):
         self.stdev = stdev
         self.static = static
         self.t_prev = -1
+        self._key = None
+        self.function = None
 
     # def value(self):
     #     """Generate a value."""
@@ -168,12 +371,28 @@ class Exponential(Param):
     #     return x
 
     def state(self, t: int = 0):
-        if (t != self.t_prev) and (t == 0 or not self.static):
-            assert t == self.t_prev + 1
-            self.value = (self.mean - self.stdev) + np.random.exponential(self.stdev)
-            self.t_prev = t
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
+        if (t != self.t_prev) and (self.t_prev == -1 or not self.static):
+            if self.static:
+                self.value = (self.mean - self.stdev) + np.random.exponential(self.stdev)
+            else:
+                self.value = self._keyed_value(t)
+            # Static values hold from t = 0.
+            self.t_prev = 0 if self.static else t
         return self.value
 
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        return (self.mean - self.stdev) + np.random.exponential(self.stdev, n)
+
+    def _keyed_value(self, t: int) -> float:
+        z = -float(np.log(1.0 - _uniform(self._random_key(), t)))
+        return (self.mean - self.stdev) + self.stdev * z
+
+    def _keyed_values(self, start: int, stop: int) -> np.ndarray:
+        z = -np.log(1.0 - _uniforms(self._random_key(), np.arange(start, stop)))
+        return (self.mean - self.stdev) + self.stdev * z
+
 
 class Sum(Param):
     """"""
@@ -184,12 +403,19 @@ class Sum(Param):
         self.t_prev = -1
 
     def state(self, t: int = 0):
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             self.value = sum([param.state(t) for param in self.params])
             self.t_prev = t
         return self.value
 
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        return sum([param.sample(n, memo) for param in self.params])
+
+    def _values(self, start: int, stop: int, memo: dict = None) -> np.ndarray:
+        return sum([param._span(start, stop, memo) for param in self.params])
+
 
 class Difference(Param):
     """"""
@@ -200,12 +426,19 @@ class Difference(Param):
         self.t_prev = -1
 
     def state(self, t: int = 0):
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             self.value = self.first.state(t) - self.second.state(t)
             self.t_prev = t
         return self.value
 
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        return self.first.sample(n, memo) - self.second.sample(n, memo)
+
+    def _values(self, start: int, stop: int, memo: dict = None) -> np.ndarray:
+        return self.first._span(start, stop, memo) - self.second._span(start, stop, memo)
+
 
 class Product(Param):
     """"""
@@ -216,14 +449,27 @@ class Product(Param):
         self.t_prev = -1
 
     def state(self, t: int = 0):
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             self.value = 1
             for val in [param.state(t) for param in self.params]:
                 self.value *= val
             self.t_prev = t
         return self.value
 
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        values = np.ones(n)
+        for param in self.params:
+            values = values * param.sample(n, memo)
+        return values
+
+    def _values(self, start: int, stop: int, memo: dict = None) -> np.ndarray:
+        values = 1
+        for param in self.params:
+            values = values * param._span(start, stop, memo)
+        return values
+
 
 class Quotient(Param):
     """"""
@@ -234,12 +480,21 @@ class Quotient(Param):
         self.t_prev = -1
 
     def state(self, t: int = 0):
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             self.value = self.dividend.state(t) / self.divisor.state(t)
             self.t_prev = t
         return self.value
 
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        return self.dividend.sample(n, memo) / self.divisor.sample(n, memo)
+
+    def _values(self, start: int, stop: int, memo: dict = None) -> np.ndarray:
+        return self.dividend._span(start, stop, memo) / self.divisor._span(
+            start, stop, memo
+        )
+
 
 class Clip(Param):
     """"""
@@ -251,14 +506,29 @@ class Clip(Param):
         self.t_prev = -1
 
     def state(self, t: int = 0):
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             self.value = max(
                 self.min.state(t), min(self.param.state(t), self.max.state(t))
             )
             self.t_prev = t
         return self.value
 
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        return np.maximum(
+            self.min.sample(n, memo),
+            np.minimum(self.param.sample(n, memo), self.max.sample(n, memo)),
+        )
+
+    def _values(self, start: int, stop: int, memo: dict = None) -> np.ndarray:
+        return np.maximum(
+            self.min._span(start, stop, memo),
+            np.minimum(
+                self.param._span(start, stop, memo), self.max._span(start, stop, memo)
+            ),
+        )
+
 
 class Dynamic(Param):
     """Parameters whose values depend on the previous value.
@@ -272,6 +542,10 @@ class Dynamic(Param):
     themselves have a ``delta``/``ratio`` argument, resulting in
     higher-order random walks.
 
+    Values are kept at regular checkpoints, so evaluating an earlier
+    or much later timepoint replays the walk from the nearest known
+    value rather than from the start.
+
     Args:
         start: The starting value, which can be obtained from a Param.
         delta: A value to add to the previous value to get the next.
@@ -282,6 +556,9 @@ class Dynamic(Param):
 
     """
 
+    # Timepoints between checkpoints:
+    _checkpoint_interval = 256
+
     def __init__(
         self,
         start: [float, Param] = None,
@@ -296,8 +573,12 @@ class Dynamic(Param):
         self.min = make_param(min)
         self.max = make_param(max)
         self.t_prev = -1
+        # Values at multiples of the checkpoint interval:
+        self._checkpoints = {}
 
     def state(self, t: int = 0):
+        if self._series_t0 <= t < self._series_end:
+            return self._recall(t)
         if t == self.t_prev:
             return self.value
         elif t == 0:
@@ -310,9 +591,15 @@ class Dynamic(Param):
             self.t_prev = 0
             # Initialize min/max:
             mn, mx = self.min.state(t), self.max.state(t)
+            self._checkpoints[0] = self.value
+            return self.value
+        elif t != self.t_prev + 1:
+            # Each value depends on the previous one, so the walk is
+            # replayed from the latest known value.
+            self.value = self._values(t, t + 1).item(0)
+            self.t_prev = t
             return self.value
         else:
-            assert t == self.t_prev + 1
             if self.delta is not None:
                 self.value += self.delta.state(t)
             if self.ratio is not None:
@@ -323,8 +610,90 @@ class Dynamic(Param):
             if mx is not None:
                 self.value = min(self.value, mx)
             self.t_prev = t
+            if t % self._checkpoint_interval == 0:
+                self._checkpoints[t] = self.value
             return self.value
 
+    def _sample(self, n: int, memo: dict) -> np.ndarray:
+        # The value at t = 0 is the starting value.
+        return self.start.sample(n, memo)
+
+    def _latest(self, t: int) -> tuple:
+        """Get the latest known timepoint up to ``t`` and its value.
+
+        Returns:
+            A (timepoint, value) tuple, or None if no value is known.
+
+        """
+        known = [(c, v) for c, v in self._checkpoints.items() if c <= t]
+        if 0 <= self.t_prev <= t:
+            known.append((self.t_prev, self.value))
+        if self._series_t0 <= t and self._series_t0 < self._series_end:
+            last = min(t, self._series_end - 1)
+            known.append((last, self._series.item(last - self._series_t0)))
+        return max(known, key=lambda x: x[0], default=None)
+
+    def _values(self, start: int, stop: int, memo: dict = None) -> np.ndarray:
+        latest = self._latest(start)
+        if latest is None:
+            latest = (0, self.start._span(0, 1, memo).item(0))
+            self._checkpoints[0] = latest[1]
+        t, value = latest
+        walk = self._walk(value, t + 1, stop, memo)
+        return np.concatenate([[value], walk])[start - t :]
+
+    def _walk(self, value: float, start: int, stop: int, memo: dict = None) -> np.ndarray:
+        """Compute the values that follow one value.
+
+        The arithmetic is done in the same order as by ``state``, so
+        the values are identical.
+
+        """
+        if stop <= start:
+            return np.empty(0)
+        delta = None if self.delta is None else self.delta._span(start, stop, memo)
+        ratio = None if self.ratio is None else self.ratio._span(start, stop, memo)
+        mn = self.min._span(start, stop, memo).tolist()
+        mx = self.max._span(start, stop, memo).tolist()
+        walk = np.empty(0)
+        if delta is None or ratio is None:
+            # Until the walk is first clipped, it is a cumulative sum or
+            # product.
+            if ratio is not None:
+                walk = np.cumprod(np.concatenate([[value], ratio]))[1:]
+            elif delta is not None:
+                walk = np.cumsum(np.concatenate([[value], delta]))[1:]
+            else:
+                walk = np.repeat([value], stop - start)
+            low = np.array([-np.inf if x is None else x for x in mn])
+            high = np.array([np.inf if x is None else x for x in mx])
+            clipped = np.flatnonzero((walk < low) | (walk > high))
+            if len(clipped) > 0:
+                walk = walk[: clipped[0]]
+                if len(walk) > 0:
+                    value = walk.item(-1)
+        if len(walk) < stop - start:
+            # Each clipped value changes the rest of the walk, so the
+            # rest is computed one step at a time.
+            delta = None if delta is None else delta.tolist()
+            ratio = None if ratio is None else ratio.tolist()
+            values = []
+            for i in range(len(walk), stop - start):
+                if delta is not None:
+                    value += delta[i]
+                if ratio is not None:
+                    value *= ratio[i]
+                if mn[i] is not None:
+                    value = max(value, mn[i])
+                if mx[i] is not None:
+                    value = min(value, mx[i])
+                values.append(value)
+            walk = np.concatenate([walk, values])
+        interval = self._checkpoint_interval
+        for t in range(-(-start // interval) * interval, stop, interval):
+            self._checkpoints[t] = walk.item(t - start)
+        return walk
+
 
 # class Cyclical(Param):
 #     """Parameters that oscillate between values.
@@ -381,6 +750,309 @@ def fixed_value(x: Union[float, str, Param], t: int = 0) -> Union[float, str]:
         return x
 
 
+def _nodes(x, seen: set = None) -> Iterator:
+    """Iterate over an object and everything reachable from it.
+
+    Follows object attributes and the items of lists, tuples, and
+    dicts, so this covers Params, Points, Colors, shapes, and
+    collections of them.  Each object is visited once.
+
+    """
+    seen = set() if seen is None else seen
+    if id(x) in seen:
+        return
+    if isinstance(x, (list, tuple)):
+        children = x
+    elif isinstance(x, dict):
+        children = x.values()
+    elif hasattr(x, "__dict__") and not callable(x):
+        seen.add(id(x))
+        yield x
+        children = vars(x).values()
+    else:
+        return
+    for child in children:
+        yield from _nodes(child, seen)
+
+
+def is_static(x) -> bool:
+    """Check whether an object's value stays fixed after t = 0.
+
+    Random Params with ``static`` set to False and ``Dynamic`` Params
+    change over time, as does anything that depends on them.
+
+    Args:
+        x: A Param, Point, Color, shape, or (nested) collection of them.
+          Other values are static.
+
+    """
+    for node in _nodes(x):
+        if isinstance(node, Dynamic) or getattr(node, "static", True) is False:
+            return False
+    return True
+
+
+def _static(x, memo: dict) -> bool:
+    """Check whether an object is static, remembering every object checked.
+
+    This gives the same result as ``is_static``, but checking many
+    objects of the same tree with one ``memo`` visits each object
+    once, instead of once per object that depends on it.
+
+    Args:
+        x: A Param, Point, Color, shape, or (nested) collection of them.
+        memo: Results by object ID, filled in by the check.
+
+    """
+    if isinstance(x, (list, tuple)):
+        return all(_static(child, memo) for child in x)
+    elif isinstance(x, dict):
+        return all(_static(child, memo) for child in x.values())
+    elif hasattr(x, "__dict__") and not callable(x):
+        if id(x) not in memo:
+            memo[id(x)] = True  # Ends the check if the object is reached again.
+            memo[id(x)] = not (
+                isinstance(x, Dynamic) or getattr(x, "static", True) is False
+            ) and all(_static(child, memo) for child in vars(x).values())
+        return memo[id(x)]
+    return True
+
+
+# Number of timepoints whose values are stored at a time for rendering:
+_chunk_size = 64
+
+
+def _precomputed(x, start: int, stop: int) -> Iterator[int]:
+    """Iterate over timepoints with the values of changing Params stored.
+
+    Rendering a sequence of frames then looks up each Param's values
+    instead of evaluating its tree every frame (see ``Param.series``),
+    and gives the same frames as rendering them one at a time.  The
+    values are computed for a chunk of timepoints at a time, and
+    dropped when moving on to the next chunk and when the iteration
+    finishes, so memory doesn't grow with the number of frames.
+
+    Args:
+        x: A Param, Point, Color, shape, or (nested) collection of them.
+        start: The first timepoint.
+        stop: The timepoint to stop before.
+
+    Yields:
+        Each timepoint, once its values are stored.
+
+    """
+    memo = {}
+    params = [
+        node for node in _nodes(x) if isinstance(node, Param) and not _static(node, memo)
+    ]
+    try:
+        # The first timepoint is evaluated as usual, so that random
+        # values are drawn in drawing order, as for a single frame.
+        if start < stop:
+            yield start
+        for t in range(start + 1, stop, _chunk_size):
+            end = min(t + _chunk_size, stop)
+            _precompute_series(params, t, end)
+            yield from range(t, end)
+    finally:
+        for param in params:
+            if "_series" in vars(param):
+                del param._series, param._series_t0, param._series_end
+
+
+def _precompute_series(params: list, start: int, stop: int):
+    """Store the values of Params for a range of timepoints.
+
+    Values stored before are replaced, after they're used to continue
+    ``Dynamic`` walks.
+
+    Args:
+        params: The Params.
+        start: The first timepoint.
+        stop: The timepoint to stop before.
+
+    """
+    memo = {}
+    values = [param._span(start, stop, memo) for param in params]
+    for param, series in zip(params, values):
+        param._series = series
+        param._series_t0 = start
+        param._series_end = stop
+
+
+# Attributes that hold the evaluation state of Params and Points:
+_state_attributes = ["value", "t_prev", "_key", "_checkpoints"]
+
+# Attributes that are recomputed as needed from the evaluation state:
+_derived_attributes = ["_series", "_series_t0", "_series_end"]
+
+
+def snapshot(x) -> dict:
+    """Record the evaluation state of an object and everything in it.
+
+    Together with ``restore``, this lets a long rendering be resumed
+    or a frame be revisited without evaluating earlier frames again.
+    The snapshot includes numpy's random number generator state, so
+    values generated after restoring it match those generated after
+    taking it.
+
+    Args:
+        x: A Param, Point, Color, shape, or (nested) collection of them.
+
+    Returns:
+        A snapshot, which can be pickled.
+
+    """
+    nodes = [
+        {
+            name: dict(value) if type(value) is dict else value
+            for name, value in vars(node).items()
+            if name in _state_attributes
+        }
+        for node in _nodes(x)
+        if hasattr(node, "t_prev")
+    ]
+    return dict(nodes=nodes, random=np.random.get_state())
+
+
+def restore(x, snapshot: dict):
+    """Return an object to the evaluation state recorded in a snapshot.
+
+    The object must be the one the snapshot was taken of, or one
+    constructed in exactly the same way (e.g. by the same script in
+    another process).
+
+    Args:
+        x: A Param, Point, Color, shape, or (nested) collection of them.
+        snapshot: A snapshot from ``snapshot``.
+
+    """
+    nodes = [node for node in _nodes(x) if hasattr(node, "t_prev")]
+    if len(nodes) != len(snapshot["nodes"]):
+        raise ValueError("The snapshot is of a different object.")
+    for node, state in zip(nodes, snapshot["nodes"]):
+        attributes = vars(node)
+        for name in _state_attributes + _derived_attributes:
+            if name not in state:
+                attributes.pop(name, None)
+        attributes.update(
+            {
+                name: dict(value) if type(value) is dict else value
+                for name, value in state.items()
+            }
+        )
+    np.random.set_state(snapshot["random"])
+
+
+# Types of values that are shared rather than copied by ``clone``:
+_immutable = {int, float, str, bool, type(None)}
+
+# Attributes reset to None by ``clone`` so that copies draw their own
+# random values for each frame:
+_unshared = {"_key"}
+
+
+def clone(x, memo: dict = None):
+    """Copy an object, sharing the parts that never change.
+
+    Params, Points, Colors, shapes, and the lists, tuples, dicts, and
+    arrays that hold them are copied, so the copy's random values are
+    sampled independently and it can be modified separately.  Values
+    like numbers, strings, and functions are shared.  This is much
+    faster than ``copy.deepcopy``, which handles arbitrary objects.
+
+    Args:
+        x: The object to copy.
+        memo: A dict mapping the ids of objects already copied to
+          their copies, so that objects shared within ``x`` are also
+          shared within the copy.  Pass one in to look up the copies
+          of particular objects afterward.
+
+    Returns:
+        The copy.
+
+    """
+    if type(x) in _immutable:
+        return x
+    if memo is None:
+        memo = {}
+    copied = memo.get(id(x))
+    if copied is not None:
+        return copied
+    if isinstance(x, list):
+        copied = []
+        memo[id(x)] = copied
+        copied.extend(
+            [item if type(item) in _immutable else clone(item, memo) for item in x]
+        )
+    elif isinstance(x, tuple):
+        items = [item if type(item) in _immutable else clone(item, memo) for item in x]
+        if all(a is b for a, b in zip(items, x)):
+            return x
+        copied = tuple(items)
+    elif isinstance(x, dict):
+        copied = {}
+        memo[id(x)] = copied
+        for key, value in x.items():
+            copied[key] = value if type(value) in _immutable else clone(value, memo)
+    elif isinstance(x, np.ndarray):
+        copied = x.copy()
+    elif hasattr(x, "__dict__") and not callable(x):
+        copied = object.__new__(type(x))
+        memo[id(x)] = copied
+        attributes = copied.__dict__
+        for name, value in vars(x).items():
+            if name in _unshared:
+                attributes[name] = None
+            elif type(value) in _immutable:
+                attributes[name] = value
+            else:
+                attributes[name] = clone(value, memo)
+    else:
+        return x
+    memo[id(x)] = copied
+    return copied
+
+
+def _presampled(node) -> bool:
+    """Check whether a node is a random Param that ``_copies`` presamples."""
+    if getattr(node, "t_prev", 0) != -1 or not getattr(node, "static", False):
+        return False
+    if type(node) is Param:
+        return node.choices is not None
+    return type(node) in (Uniform, Normal, Exponential)
+
+
+def _copies(x, n: int) -> list:
+    """Make copies of an object with their random values drawn at once.
+
+    Each random Param reachable from the copies gets its t = 0 value
+    from one vectorized ``sample`` call per Param of the original,
+    rather than one random number generator call per copy.  Params
+    that have already been evaluated keep their values.
+
+    Args:
+        x: The object to copy.
+        n: The number of copies.
+
+    Returns:
+        A list of copies.
+
+    """
+    leaves = [node for node in _nodes(x) if _presampled(node)]
+    copies = []
+    targets = []
+    for i in range(n):
+        memo = {}
+        copies.append(clone(x, memo))
+        targets.append([memo[id(leaf)] for leaf in leaves])
+    for i, leaf in enumerate(leaves):
+        for nodes, value in zip(targets, leaf.sample(n).tolist()):
+            nodes[i].value = value
+            nodes[i].t_prev = 0
+    return copies
+
+
 def make_param(x: Union[float, str, Param]) -> Param:
     """Get a ``Param`` object even if something else is supplied.
 
@@ -5,9 +5,10 @@ Define objects that represent dynamic 2D points.
 
 """
 
+import numpy as np
 from typing import Tuple, Union
 from .geom import endpoint, rad, rotated_point, scaled_point
-from .param import Param, Uniform, make_param, fixed_value
+from .param import Param, Uniform, make_param, fixed_value, clone
 
 
 class Point:
@@ -32,9 +33,12 @@ class Point:
     def __radd__(self, other):
         return Translation(other, self)
 
+    def clone(self):
+        """Get a copy that is evaluated independently (see ``clone``)."""
+        return clone(self)
+
     def state(self, t: int = 0):
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             if type(self.point) is tuple:
                 self.value = (fixed_value(self.point[0], t), fixed_value(self.point[1], t))
             else:
@@ -71,7 +75,6 @@ class Move(Point):
 
     def state(self, t: int = 0):
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             self.value = endpoint(
                 self.ref.state(t), rad(self.direction.state(t)), self.distance.state(t)
             )
@@ -87,7 +90,6 @@ class Translation(Point):
 
     def state(self, t: int = 0):
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             p1 = self.start.state(t)
             p2 = self.move.state(t)
             self.value = (p1[0] + p2[0], p1[1] + p2[1])
@@ -104,11 +106,11 @@ class Rotation(Point):
 
     def state(self, t: int = 0):
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             start = self.start.state(t)
             pivot = self.pivot.state(t)
             angle = self.angle.state(t)
             self.value = rotated_point(start, pivot, angle)
+            self.t_prev = t
         return self.value
 
 
@@ -121,14 +123,118 @@ class Scaling(Point):
 
     def state(self, t: int = 0):
         if t != self.t_prev:
-            assert t == self.t_prev + 1
             start = self.start.state(t)
             cx = self.cx.state(t)
             cy = self.cy.state(t)
             self.value = scaled_point(start, cx, cy)
+            self.t_prev = t
+        return self.value
+
+
+class Affine(Point):
+    """A point transformed by a fixed affine transformation.
+
+    Successive fixed translations, rotations, and scalings of a point
+    are combined into one matrix (see ``_transformed``), rather than
+    wrapping it in a chain of nodes that are each evaluated in turn.
+
+    Args:
+        start: The point to transform.
+        matrix: A 3 x 3 matrix that transforms points in homogeneous
+          coordinates.
+        coefficients: The first two rows of ``matrix`` as a tuple of
+          floats, if already computed for another point.
+
+    """
+
+    def __init__(
+        self,
+        start: Union[Tuple[float, float], Point],
+        matrix: np.ndarray,
+        coefficients: Tuple[float, ...] = None,
+    ):
+        self.start = make_point(start)
+        self.matrix = matrix
+        # Unpacked once so that evaluating the point is plain arithmetic:
+        if coefficients is None:
+            coefficients = tuple(matrix[:2].ravel().tolist())
+        self.coefficients = coefficients
+        self.t_prev = -1
+
+    def state(self, t: int = 0):
+        if t != self.t_prev:
+            x, y = self.start.state(t)
+            a, b, c, d, e, f = self.coefficients
+            self.value = (a * x + b * y + c, d * x + e * y + f)
+            self.t_prev = t
         return self.value
 
 
+def _translation_matrix(dx: float, dy: float) -> np.ndarray:
+    """Get the affine matrix for a translation."""
+    return np.array([[1.0, 0, dx], [0, 1, dy], [0, 0, 1]])
+
+
+def _rotation_matrix(angle: float, pivot: Tuple[float, float] = (0, 0)) -> np.ndarray:
+    """Get the affine matrix for a rotation.
+
+    Args:
+        angle: The angle of rotation in radians.
+        pivot: The rotation pivot point.
+
+    """
+    cos, sin = np.cos(angle), np.sin(angle)
+    x, y = pivot
+    return np.array(
+        [
+            [cos, -sin, x - cos * x + sin * y],
+            [sin, cos, y - sin * x - cos * y],
+            [0, 0, 1],
+        ]
+    )
+
+
+def _scaling_matrix(cx: float, cy: float = None) -> np.ndarray:
+    """Get the affine matrix for a scaling."""
+    cy = cx if cy is None else cy
+    return np.array([[cx, 0.0, 0], [0, cy, 0], [0, 0, 1]])
+
+
+def _transformed(
+    point: Union[Tuple[float, float], Point], matrix: np.ndarray, combined: dict = None
+) -> Affine:
+    """Apply a fixed affine transformation to a point.
+
+    If the point is already an ``Affine`` point, the result transforms
+    its starting point by the product of the two matrices, so chains of
+    transformations stay one node deep.
+
+    Args:
+        point: The point to transform.
+        matrix: A 3 x 3 affine matrix.
+        combined: A dict for reusing products of ``matrix`` with
+          existing matrices and their coefficients, keyed by the ids
+          of the existing matrices (or None for ``matrix`` itself), so
+          that points transformed together keep sharing one matrix.
+
+    Returns:
+        The transformed point.
+
+    """
+    if type(point) is Affine:
+        start, old = point.start, point.matrix
+    else:
+        start, old = point, None
+    if combined is None:
+        return Affine(start, matrix if old is None else matrix @ old)
+    key = None if old is None else id(old)
+    if key not in combined:
+        product = matrix if old is None else matrix @ old
+        # Keep the old matrix so its id can't be reused.
+        combined[key] = (old, product, tuple(product[:2].ravel().tolist()))
+    return Affine(start, *combined[key][1:])
+
+
 def make_point(x: Union[Point, Point]) -> Point:
     """Get a ``Point`` object even if a tuple is supplied.
 
@@ -0,0 +1,260 @@
+"""
+raster.py
+=========
+Convert SVG representations of graphics to raster images.
+
+"""
+
+import io
+import struct
+import subprocess
+import sys
+import zlib
+import numpy as np
+from typing import Union, Callable, Iterable, IO
+
+# Number = Union[int, float]
+Backend = Union[str, Callable]
+
+
+def _cairosvg_png(svg: str, scale: float = 1, force_RGBA: bool = False) -> bytes:
+    """Rasterize an SVG string in-process using cairosvg.
+
+    Output is always RGBA, so ``force_RGBA`` has no effect.
+
+    """
+    import cairosvg
+
+    return cairosvg.svg2png(bytestring=svg.encode(), scale=scale)
+
+
+def _convert_png(svg: str, scale: float = 1, force_RGBA: bool = False) -> bytes:
+    """Rasterize an SVG string using an ImageMagick subprocess.
+
+    The SVG is piped through ``convert`` so no temporary files are
+    written.
+
+    """
+    frmt = "PNG32:-" if force_RGBA else "PNG:-"
+    args = ["convert", "-background", "None"]
+    if scale != 1:
+        args += ["-density", str(96 * scale)]
+    result = subprocess.run(
+        args + ["svg:-", frmt], input=svg.encode(), stdout=subprocess.PIPE, check=True
+    )
+    return result.stdout
+
+
+def _cairosvg_array(svg: str, scale: float = 1) -> np.ndarray:
+    """Rasterize an SVG string with cairosvg, returning the pixel buffer.
+
+    Returns:
+        A height x width x 4 array viewing the cairo surface's data,
+        which is premultiplied ARGB in native byte order.
+
+    """
+    from cairosvg.parser import Tree
+    from cairosvg.surface import PNGSurface
+
+    surface = PNGSurface(Tree(bytestring=svg.encode()), None, 96, scale=scale)
+    image = surface.cairo
+    image.flush()
+    stride = image.get_stride()
+    data = np.frombuffer(image.get_data(), dtype=np.uint8)
+    data = data.reshape(surface.height, stride)[:, : surface.width * 4]
+    return data.reshape(surface.height, surface.width, 4)
+
+
+def _unpremultiply(argb: np.ndarray, dtype: type = np.uint8) -> np.ndarray:
+    """Convert premultiplied native-order ARGB pixels to RGBA.
+
+    Args:
+        argb: A height x width x 4 array of 8-bit values as stored by
+          cairo.
+        dtype: The output type.  Float output is scaled to 0-1.
+
+    """
+    order = [2, 1, 0, 3] if sys.byteorder == "little" else [1, 2, 3, 0]
+    # This is the only copy of the pixels:
+    rgba = np.empty(argb.shape, dtype=np.uint8)
+    for i, channel in enumerate(order):
+        rgba[..., i] = argb[..., channel]
+    alpha = rgba[..., 3]
+    if np.issubdtype(dtype, np.floating):
+        out = rgba.astype(dtype) / 255
+        a = out[..., 3:]
+        np.divide(out[..., :3], a, out=out[..., :3], where=a > 0)
+        return out
+    partial = (alpha > 0) & (alpha < 255)
+    if partial.any():
+        a = alpha[partial].astype(np.uint16)[:, np.newaxis]
+        rgb = rgba[partial, :3].astype(np.uint16)
+        rgba[partial, :3] = np.minimum((rgb * 255 + a // 2) // a, 255)
+    return rgba.astype(dtype, copy=False)
+
+
+raster_backends = {"cairosvg": _cairosvg_png, "convert": _convert_png}
+
+# Backends that can provide pixels without encoding a PNG:
+array_backends = {"cairosvg": _cairosvg_array}
+
+_default_backend = None
+
+
+def default_backend() -> str:
+    """Get the name of the preferred available raster backend.
+
+    cairosvg is used if it can be imported (which requires the cairo
+    library), otherwise the ImageMagick ``convert`` command is used.
+
+    """
+    global _default_backend
+    if _default_backend is None:
+        try:
+            import cairosvg
+
+            _default_backend = "cairosvg"
+        except (ImportError, OSError):
+            _default_backend = "convert"
+    return _default_backend
+
+
+def rasterize(
+    svg: str, backend: Backend = None, scale: float = 1, force_RGBA: bool = False
+) -> bytes:
+    """Convert an SVG string to PNG data.
+
+    Args:
+        svg: An SVG document.
+        backend: The name of a backend in ``raster_backends``, or a
+          function with the same signature as the backend functions
+          that returns PNG bytes.  If None, ``default_backend()`` is
+          used.
+        scale: Factor by which to scale the output dimensions.
+        force_RGBA: Whether to write PNG in RGBA colorspace, even if
+          it could be grayscale.
+
+    Returns:
+        The PNG file contents.
+
+    Raises:
+        ValueError: If the backend isn't one that rasterizes SVG.
+
+    """
+    if backend is None:
+        backend = default_backend()
+    if not callable(backend):
+        if backend == "cairo":
+            raise ValueError(
+                'The "cairo" backend draws shapes directly, so it can\'t '
+                "rasterize SVG.  Use Canvas.png or draw_png instead."
+            )
+        if backend not in raster_backends:
+            raise ValueError("Unknown raster backend: {}".format(backend))
+        backend = raster_backends[backend]
+    return backend(svg, scale, force_RGBA)
+
+
+def rasterize_array(
+    svg: str, backend: Backend = None, scale: float = 1, dtype: type = np.uint8
+) -> np.ndarray:
+    """Convert an SVG string to an array of RGBA pixel values.
+
+    Backends in ``array_backends`` render straight to a pixel buffer,
+    skipping PNG encoding and decoding.
+
+    Args:
+        svg: An SVG document.
+        backend: The raster backend (see ``rasterize``).
+        scale: Factor by which to scale the output dimensions.
+        dtype: The type of the output values.  Integer arrays hold
+          values from 0 to 255, and float arrays from 0 to 1.
+
+    Returns:
+        A height x width x 4 array.
+
+    """
+    if backend is None:
+        backend = default_backend()
+    if not callable(backend) and backend in array_backends:
+        return _unpremultiply(array_backends[backend](svg, scale), dtype)
+    from PIL import Image
+
+    png = rasterize(svg, backend, scale, force_RGBA=True)
+    rgba = np.asarray(Image.open(io.BytesIO(png)).convert("RGBA"))
+    if np.issubdtype(dtype, np.floating):
+        return rgba.astype(dtype) / 255
+    return rgba.astype(dtype, copy=False)
+
+
+def composite(bottom: np.ndarray, top: np.ndarray) -> np.ndarray:
+    """Draw one RGBA image over another.
+
+    Args:
+        bottom: A height x width x 4 array of 8-bit values.
+        top: An array of the same shape to draw on top.
+
+    Returns:
+        The combined image as an array of 8-bit values.
+
+    """
+    top_alpha = top[..., 3:] / 255
+    bottom_alpha = bottom[..., 3:] / 255 * (1 - top_alpha)
+    alpha = top_alpha + bottom_alpha
+    rgb = top[..., :3] * top_alpha + bottom[..., :3] * bottom_alpha
+    rgb = np.divide(rgb, alpha, out=np.zeros_like(rgb), where=alpha > 0)
+    out = np.concatenate([rgb, alpha * 255], axis=2)
+    return np.round(out).astype(np.uint8)
+
+
+def write_bytes(data: bytes, file: Union[str, IO]):
+    """Write data to a file name or binary file object."""
+    if isinstance(file, str):
+        with open(file, "wb") as f:
+            f.write(data)
+    else:
+        file.write(data)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    """Encode a PNG chunk with its length and checksum."""
+    crc = zlib.crc32(data, zlib.crc32(kind))
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+
+def write_png_rows(
+    blocks: Iterable[np.ndarray], file: Union[str, IO], width: int, height: int
+):
+    """Write an RGBA PNG image one block of rows at a time.
+
+    The image is compressed as it is written, so the whole image
+    never has to be held in memory.
+
+    Args:
+        blocks: Arrays of 8-bit RGBA values, each with ``width``
+          columns, which together have ``height`` rows.
+        file: A file name or binary file object.
+        width: The image width.
+        height: The image height.
+
+    """
+    if isinstance(file, str):
+        with open(file, "wb") as f:
+            write_png_rows(blocks, f, width, height)
+        return
+    file.write(b"\x89PNG\r\n\x1a\n")
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    file.write(_png_chunk(b"IHDR", header))
+    compressor = zlib.compressobj()
+    rows = 0
+    for block in blocks:
+        # Each row starts with a filter type byte (0 for none).
+        raw = np.zeros((block.shape[0], width * 4 + 1), dtype=np.uint8)
+        raw[:, 1:] = block.reshape(block.shape[0], width * 4)
+        data = compressor.compress(raw.tobytes())
+        if len(data) > 0:
+            file.write(_png_chunk(b"IDAT", data))
+        rows += block.shape[0]
+    assert rows == height
+    file.write(_png_chunk(b"IDAT", compressor.flush()))
+    file.write(_png_chunk(b"IEND", b""))
@@ -0,0 +1,295 @@
+"""
+server.py
+=========
+Render graphics in a long-running service to avoid repeated startup
+costs.
+
+The server keeps a pool of worker processes that have already
+imported algoraphics and its installed optional dependencies, and
+listens on a Unix socket for jobs.  A job is
+either a script that creates a Canvas named ``canvas`` (with the
+package available as ``ag``) or a pickled Canvas, and the response is
+the rendered SVG or PNG data.  Start a server with::
+
+    python -m algoraphics.server /tmp/algoraphics.sock
+
+Messages are pickled, so the socket should only be accessible to
+trusted users.
+
+"""
+
+import importlib
+import multiprocessing
+import os
+import pickle
+import queue
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import traceback
+import numpy as np
+from typing import IO
+
+import algoraphics
+
+
+# Optional dependencies that algoraphics imports when first needed:
+_optional_modules = [
+    "cairosvg",
+    "cairocffi",
+    "cairo",
+    "shapely.geometry",
+    "scipy.ndimage",
+    "PIL.Image",
+    "PIL.ImageColor",
+    "imageio_ffmpeg",
+]
+
+
+def _preload():
+    """Import the optional dependencies that are installed."""
+    for name in _optional_modules:
+        try:
+            importlib.import_module(name)
+        except (ImportError, OSError):  # OSError if a C library is missing.
+            pass
+
+
+def _send(f: IO, obj):
+    """Write a length-prefixed pickled object to a binary file."""
+    data = pickle.dumps(obj)
+    f.write(struct.pack(">Q", len(data)) + data)
+    f.flush()
+
+
+def _recv(f: IO):
+    """Read a length-prefixed pickled object from a binary file."""
+    header = f.read(8)
+    if len(header) < 8:
+        raise EOFError("Connection closed.")
+    (size,) = struct.unpack(">Q", header)
+    return pickle.loads(f.read(size))
+
+
+def _run_job(job: dict) -> bytes:
+    """Create or load a canvas and render it.
+
+    Args:
+        job: A dict with either ``script``, the source code of a script
+          that assigns a Canvas to ``canvas``, or ``scene``, a Canvas.
+          ``format`` is "svg" or "png", and ``seed`` optionally seeds
+          numpy's random number generator first.
+
+    Returns:
+        The rendered file contents.
+
+    """
+    if job.get("seed") is not None:
+        np.random.seed(job["seed"])
+    if job.get("script") is not None:
+        namespace = {"__name__": "__render__", "ag": algoraphics}
+        exec(compile(job["script"], "<job>", "exec"), namespace)
+        canvas = namespace["canvas"]
+    else:
+        canvas = job["scene"]
+        # A cached SVG may be out of date in this process.
+        canvas.invalidate()
+    if job.get("format", "png") == "svg":
+        return canvas.get_svg().encode()
+    return canvas.png()
+
+
+def _work(conn):
+    """Run jobs received over a pipe until it is closed."""
+    _preload()  # Already done if the process was forked.
+    np.random.seed()  # Don't share the parent's random state.
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        try:
+            result = ("ok", _run_job(job))
+        except Exception:
+            result = ("error", traceback.format_exc())
+        conn.send(result)
+
+
+class _Worker:
+    """A worker process and the pipe used to send it jobs."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_work, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self):
+        """Stop the process, waiting for it to finish if it is idle."""
+        self.conn.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """A server that renders jobs in a pool of warm worker processes.
+
+    Workers are forked (where supported) from a single-threaded fork
+    server that has imported algoraphics and its installed optional
+    dependencies, so they start without import overhead and without
+    inheriting locks held by the server's handler threads.
+    A worker that exceeds the timeout is killed and replaced, and
+    workers are replaced after a number of jobs to limit the effects
+    of leaked memory or global state.
+
+    Args:
+        path: The Unix socket path to listen on.
+        workers: The number of worker processes.  If None, the number
+          of CPUs is used.
+        timeout: The default number of seconds a job may take.
+        max_jobs: The number of jobs after which a worker is replaced.
+
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, path: str, workers: int = None, timeout: float = 60, max_jobs: int = 100
+    ):
+        _preload()
+        # Replacement workers are started from handler threads, so they
+        # must not be forked from this multi-threaded process.
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self.context = multiprocessing.get_context("forkserver")
+            loaded = [name for name in _optional_modules if name in sys.modules]
+            self.context.set_forkserver_preload(["algoraphics"] + loaded)
+        else:
+            self.context = multiprocessing.get_context("spawn")
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self.workers = []
+        self.lock = threading.Lock()
+        self.idle = queue.Queue()
+        for i in range(os.cpu_count() if workers is None else workers):
+            self.idle.put(self._spawn())
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, _Handler)
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self.context)
+        with self.lock:
+            self.workers.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.stop()
+        with self.lock:
+            self.workers.remove(worker)
+        return self._spawn()
+
+    def run(self, job: dict) -> tuple:
+        """Run a job in the next available worker.
+
+        Returns:
+            A tuple of status ("ok", "error", or "timeout") and either
+            the rendered data or an error message.
+
+        """
+        worker = self.idle.get()
+        try:
+            timeout = job.get("timeout")
+            timeout = self.timeout if timeout is None else timeout
+            worker.conn.send(job)
+            if not worker.conn.poll(timeout):
+                worker = self._replace(worker)
+                return ("timeout", "Job exceeded {} seconds.".format(timeout))
+            result = worker.conn.recv()
+            worker.jobs += 1
+            if worker.jobs >= self.max_jobs:
+                worker = self._replace(worker)
+            return result
+        except (EOFError, OSError):
+            worker = self._replace(worker)
+            return ("error", "Worker process died.")
+        finally:
+            if worker.process.is_alive():
+                self.idle.put(worker)
+
+    def server_close(self):
+        super().server_close()
+        with self.lock:
+            for worker in self.workers:
+                worker.stop()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Handle one job per connection."""
+
+    def handle(self):
+        try:
+            job = _recv(self.rfile)
+        except EOFError:
+            return
+        _send(self.wfile, self.server.run(job))
+
+
+def render(
+    path: str,
+    script: str = None,
+    scene: "algoraphics.Canvas" = None,
+    format: str = "png",
+    seed: int = None,
+    timeout: float = None,
+) -> bytes:
+    """Render a canvas using a running ``RenderServer``.
+
+    Args:
+        path: The server's Unix socket path.
+        script: Python source code that assigns a Canvas to
+          ``canvas``.  The package is available as ``ag``.
+        scene: A Canvas to render instead of running a script.
+        format: The output format, "svg" or "png".
+        seed: A seed for numpy's random number generator, for
+          reproducible output.
+        timeout: Seconds the job may take, overriding the server's
+          default.
+
+    Returns:
+        The rendered file contents.
+
+    """
+    job = dict(script=script, scene=scene, format=format, seed=seed, timeout=timeout)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        with sock.makefile("rwb") as f:
+            _send(f, job)
+            status, value = _recv(f)
+    if status == "timeout":
+        raise TimeoutError(value)
+    elif status != "ok":
+        raise RuntimeError(value)
+    return value
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run an algoraphics render server.")
+    parser.add_argument("path", help="Unix socket path to listen on.")
+    parser.add_argument("--workers", type=int, help="Number of worker processes.")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds per job.")
+    parser.add_argument("--max-jobs", type=int, default=100, help="Jobs per worker.")
+    args = parser.parse_args()
+    with RenderServer(args.path, args.workers, args.timeout, args.max_jobs) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -7,18 +7,29 @@ Create and manipulate shapes.
 
 
 import numpy as np
-from copy import deepcopy
-from shapely.geometry import GeometryCollection
-from shapely.geometry import Polygon as SPolygon
-from shapely.geometry import Point as SPoint
-from typing import Sequence, Tuple, Union, List
+from typing import Sequence, Tuple, Union, List, Callable, TYPE_CHECKING
 
 from .geom import (
     rad,
 )
-from .param import fixed_value, Param, make_param
+from .param import fixed_value, is_static, Param, make_param, clone, _copies
 from .color import Color
-from .point import Point, Translation, Rotation, Scaling, make_point
+
+if TYPE_CHECKING:
+    from shapely.geometry import GeometryCollection
+    from shapely.geometry import Polygon as SPolygon
+    from shapely.geometry import Point as SPoint
+from .point import (
+    Point,
+    Translation,
+    Rotation,
+    Scaling,
+    make_point,
+    _transformed,
+    _translation_matrix,
+    _rotation_matrix,
+    _scaling_matrix,
+)
 
 # Number = Union[int, float]
 # Point = Tuple[Number, Number]
@@ -27,13 +38,27 @@ Pnt = Tuple[float, float]
 Bounds = Tuple[float, float, float, float]
 Collection = Union[list, "Shape", "Group"]
 
+# Count of modifications made to existing shapes by functions in this
+# package, used to tell when cached representations are out of date.
+_modifications = 0
+
+
+def _modified():
+    """Record that existing shapes have been modified."""
+    global _modifications
+    _modifications += 1
+
 
 class Shape:
     def __mul__(self, other):
-        return [deepcopy(self) for i in range(other)]
+        return _copies(self, other)
 
     def __rmul__(self, other):
-        return [deepcopy(self) for i in range(other)]
+        return self.__mul__(other)
+
+    def clone(self):
+        """Get a copy that is evaluated independently (see ``clone``)."""
+        return clone(self)
 
 
 class Polygon(Shape):
@@ -139,6 +164,120 @@ class Group:
             self.clip = [self.clip]
         self.filter = filter
 
+    def clone(self):
+        """Get a copy that is evaluated independently (see ``clone``)."""
+        return clone(self)
+
+
+class ShapeArray:
+    """Many static shapes of one type, stored in arrays.
+
+    Geometry is held in contiguous NumPy arrays rather than as a
+    Python object per shape and Point per vertex, which takes much
+    less memory and is written to SVG in vectorized batches.  Shape
+    arrays can be added to canvases and groups and transformed like
+    other shapes.
+
+    A style value that is a list or array is applied element-wise,
+    with one value per shape.  Other values, including Params and
+    Colors, are shared by all shapes in the array, and must not change
+    over time.
+
+    """
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def clone(self):
+        """Get a copy that is evaluated independently (see ``clone``)."""
+        return clone(self)
+
+
+class CircleArray(ShapeArray):
+    """An array of circles.
+
+    Args:
+        centers: An n x 2 array (or list) of circle centers.
+        radii: The circles' radii, either one value or one per circle.
+
+    """
+
+    def __init__(
+        self,
+        centers: Union[np.ndarray, Sequence[Pnt]],
+        radii: Union[float, Sequence[float]],
+        **style
+    ):
+        self.centers = np.array(centers, dtype=float).reshape(-1, 2)
+        self.radii = np.array(
+            np.broadcast_to(np.asarray(radii, dtype=float), len(self.centers))
+        )
+        _check_array_style(style)
+        self.style = style
+
+    def __len__(self) -> int:
+        return len(self.centers)
+
+
+class PolygonArray(ShapeArray):
+    """An array of polygons.
+
+    The vertices of all polygons are stored in one array, with the
+    polygons' start indices in another.
+
+    Args:
+        points: A list of vertex lists, one per polygon.  Or, if
+          ``offsets`` is provided, an m x 2 array of all vertices.
+        offsets: The index in ``points`` at which each polygon's
+          vertices start, followed by the total number of vertices.
+
+    """
+
+    def __init__(
+        self,
+        points: Union[np.ndarray, Sequence[Sequence[Pnt]]],
+        offsets: Sequence[int] = None,
+        **style
+    ):
+        self.vertices, self.offsets = _ragged_array(points, offsets)
+        _check_array_style(style)
+        self.style = style
+
+
+class LineArray(ShapeArray):
+    """An array of lines or polylines.
+
+    Args:
+        points: A list of point lists, one per line.  Or, if
+          ``offsets`` is provided, an m x 2 array of all points.
+        offsets: The index in ``points`` at which each line's points
+          start, followed by the total number of points.
+
+    """
+
+    def __init__(
+        self,
+        points: Union[np.ndarray, Sequence[Sequence[Pnt]]],
+        offsets: Sequence[int] = None,
+        **style
+    ):
+        self.vertices, self.offsets = _ragged_array(points, offsets)
+        _check_array_style(style)
+        self.style = style
+
+
+def _ragged_array(
+    points: Union[np.ndarray, Sequence[Sequence[Pnt]]], offsets: Sequence[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the vertex and offset arrays for a list of point lists."""
+    if offsets is None:
+        offsets = np.cumsum([0] + [len(pts) for pts in points])
+        points = [pt for pts in points for pt in pts]
+    vertices = np.array(points, dtype=float).reshape(-1, 2)
+    offsets = np.array(offsets, dtype=np.intp)
+    assert offsets[0] == 0 and offsets[-1] == len(vertices)
+    return vertices, offsets
+
 
 def rectangle(
     start: Pnt = None, w: float = None, h: float = None, bounds: Bounds = None, **style
@@ -190,18 +329,21 @@ def set_style(obj: Collection, attribute: str, value: Union[str, float, Param, C
         value: Either a single value, Color, or Param.
 
     """
+    _modified()
     if type(obj) is list:
         for o in obj:
             set_style(o, attribute, value)
     else:
+        if isinstance(obj, ShapeArray):
+            _check_array_style({attribute: value})
         obj.style[attribute] = value
 
 
 def set_styles(obj: Collection, attribute: str, value: Union[Param, Color]):
     """Set style attribute of one or more shapes.
 
-    Unlike set_style, it creates a deep copy of the Param or Color for
-    each shape so that there is variation.
+    Unlike set_style, it creates a copy of the Param or Color for each
+    shape so that there is variation.
 
     Args:
         obj: A shape or (nested) list of shapes.
@@ -209,40 +351,54 @@ def set_styles(obj: Collection, attribute: str, value: Union[Param, Color]):
         value: A Color or Param.
 
     """
+    _modified()
     if type(obj) is list:
         for o in obj:
             set_styles(o, attribute, value)
     else:
-        obj.style[attribute] = deepcopy(value)
+        if isinstance(obj, ShapeArray):
+            _check_array_style({attribute: value})
+        obj.style[attribute] = clone(value)
 
 
-def bounding_box(shapes: Collection) -> Bounds:
+def bounding_box(shapes: Collection, t: int = 0) -> Bounds:
     """Find the bounding box of a shape or shape collection.
 
-    Currently assumes t == 0.
-
     Args:
         shapes: One or more shapes.
+        t: The timepoint at which to evaluate the shapes.  Shapes
+          must already have been evaluated up to this point.
 
     Returns:
         The min x, max x, min y, and max y coordinates of the input.
 
     """
     if type(shapes) is list:
-        b = list(zip(*[bounding_box(s) for s in shapes]))
+        # Empty shape arrays draw nothing, so they don't affect the box.
+        shapes = [s for s in shapes if not (isinstance(s, ShapeArray) and len(s) == 0)]
+        b = list(zip(*[bounding_box(s, t) for s in shapes]))
         return (min(b[0]), min(b[1]), max(b[2]), max(b[3]))
     elif type(shapes) is Group:
         if len(shapes.clip) > 0:
-            return bounding_box(shapes.clip)
+            return bounding_box(shapes.clip, t)
         else:
-            return bounding_box(shapes.members)
+            return bounding_box(shapes.members, t)
     elif type(shapes) in [Polygon, Spline, Line]:
-        x = [p.state()[0] for p in shapes.points]
-        y = [p.state()[1] for p in shapes.points]
+        x = [p.state(t)[0] for p in shapes.points]
+        y = [p.state(t)[1] for p in shapes.points]
         return (min(x), min(y), max(x), max(y))
     elif type(shapes) is Circle:
-        c, r = shapes.c.state(), shapes.r.state()
+        c, r = shapes.c.state(t), shapes.r.state(t)
         return (c[0] - r, c[1] - r, c[0] + r, c[1] + r)
+    elif type(shapes) is CircleArray:
+        r = shapes.radii[:, np.newaxis]
+        x0, y0 = (shapes.centers - r).min(axis=0).tolist()
+        x1, y1 = (shapes.centers + r).max(axis=0).tolist()
+        return (x0, y0, x1, y1)
+    elif type(shapes) in [PolygonArray, LineArray]:
+        x0, y0 = shapes.vertices.min(axis=0).tolist()
+        x1, y1 = shapes.vertices.max(axis=0).tolist()
+        return (x0, y0, x1, y1)
 
 
 def rotated_bounding_box(shapes: Collection, angle: float) -> Bounds:
@@ -259,31 +415,121 @@ def rotated_bounding_box(shapes: Collection, angle: float) -> Bounds:
         place.
 
     """
-    shapes = deepcopy(shapes)
+    shapes = clone(shapes)
     rotate_shapes(shapes, -1 * angle)
     return bounding_box(shapes)
 
 
-def translate_shapes(shapes: Collection, dx: float, dy: float):
-    """Shift the location of one or more shapes.
+def _fixed(*values) -> bool:
+    """Check whether transformation parameters are all plain numbers."""
+    return all(isinstance(v, (int, float, np.number)) for v in values)
+
+
+def _check_array_style(style: dict):
+    """Check that a shape array's style doesn't change over time.
+
+    Shape arrays are static, so they are written once in animations.
+
+    Raises:
+        ValueError: If any of the style values changes over time.
+
+    """
+    if not is_static(style):
+        raise ValueError(
+            "Shape arrays are static, so their style can't include values "
+            "that change over time."
+        )
+
+
+def _check_arrays(shapes: Collection, *values):
+    """Check that shape arrays aren't transformed by changing values.
+
+    Shape arrays are static, so their transformations are applied
+    using the values at t = 0.
+
+    Raises:
+        ValueError: If ``shapes`` includes a shape array and any of
+          ``values`` changes over time.
+
+    """
+
+    def has_array(shapes):
+        if type(shapes) is list:
+            return any([has_array(shape) for shape in shapes])
+        elif type(shapes) is Group:
+            return has_array(shapes.members) or has_array(shapes.clip)
+        return isinstance(shapes, ShapeArray)
+
+    if not is_static(values) and has_array(shapes):
+        raise ValueError(
+            "Shape arrays are static, so they can't be transformed by values "
+            "that change over time."
+        )
+
+
+def _transform_shapes(
+    shapes: Collection,
+    matrix: Callable[[], np.ndarray],
+    transform_point: Callable,
+    r_factor: float = None,
+    combined: dict = None,
+):
+    """Transform the points of one or more shapes.
 
     Args:
         shapes: One or more shapes.
-        dx: The horizontal shift.
-        dy: The vertical shift.
+        matrix: A function that gets the affine matrix of the
+          transformation at t = 0, which is applied to shape arrays.
+        transform_point: A function that gets the transformed version
+          of a point.
+        r_factor: For scalings, the factor by which to scale radii.
+        combined: Matrix products shared among the transformed points
+          (see ``point._transformed``).
 
     """
+    combined = {} if combined is None else combined
     if type(shapes) is list:
         for shape in shapes:
-            translate_shapes(shape, dx, dy)
+            _transform_shapes(shape, matrix, transform_point, r_factor, combined)
     elif type(shapes) is Group:
-        translate_shapes(shapes.members, dx, dy)
-        translate_shapes(shapes.clip, dx, dy)
+        _transform_shapes(shapes.members, matrix, transform_point, r_factor, combined)
+        _transform_shapes(shapes.clip, matrix, transform_point, r_factor, combined)
     elif type(shapes) in [Polygon, Spline, Line]:
-        for i in range(len(shapes.points)):
-            shapes.points[i] = Translation(shapes.points[i], (dx, dy))
+        shapes.points = [transform_point(pt, combined) for pt in shapes.points]
     elif type(shapes) is Circle:
-        shapes.c = Translation(shapes.c, (dx, dy))
+        shapes.c = transform_point(shapes.c, combined)
+        if r_factor is not None:
+            shapes.r = shapes.r * abs(r_factor)
+    elif isinstance(shapes, ShapeArray):
+        pts = _array_points(shapes)
+        m = matrix()
+        pts[:] = pts @ m[:2, :2].T + m[:2, 2]
+        if type(shapes) is CircleArray and r_factor is not None:
+            shapes.radii *= abs(fixed_value(r_factor))
+
+
+def translate_shapes(shapes: Collection, dx: float, dy: float):
+    """Shift the location of one or more shapes.
+
+    Args:
+        shapes: One or more shapes.
+        dx: The horizontal shift.
+        dy: The vertical shift.
+
+    Raises:
+        ValueError: If ``shapes`` includes a shape array and the
+          transformation changes over time.
+
+    """
+    _check_arrays(shapes, dx, dy)
+    _modified()
+    matrix = lambda: _translation_matrix(fixed_value(dx), fixed_value(dy))
+    if _fixed(dx, dy):
+        m = matrix()
+        transform_point = lambda pt, combined: _transformed(pt, m, combined)
+    else:
+        transform_point = lambda pt, combined: Translation(pt, (dx, dy))
+    _transform_shapes(shapes, matrix, transform_point)
 
 
 def rotate_shapes(shapes: Collection, angle: float, pivot: Pnt = (0, 0)):
@@ -294,18 +540,22 @@ def rotate_shapes(shapes: Collection, angle: float, pivot: Pnt = (0, 0)):
         angle: The angle of rotation in degrees.
         pivot: The rotation pivot point.
 
+    Raises:
+        ValueError: If ``shapes`` includes a shape array and the
+          transformation changes over time.
+
     """
-    if type(shapes) is list:
-        for shape in shapes:
-            rotate_shapes(shape, angle, pivot)
-    elif type(shapes) is Group:
-        rotate_shapes(shapes.members, angle, pivot)
-        rotate_shapes(shapes.clip, angle, pivot)
-    elif type(shapes) in [Polygon, Spline, Line]:
-        for i in range(len(shapes.points)):
-            shapes.points[i] = Rotation(shapes.points[i], pivot, rad(angle))
-    elif type(shapes) is Circle:
-        shapes.c = Rotation(shapes.c, pivot, rad(angle))
+    _check_arrays(shapes, angle, pivot)
+    _modified()
+    matrix = lambda: _rotation_matrix(
+        rad(fixed_value(angle)), make_point(pivot).state(0)
+    )
+    if not isinstance(pivot, Point) and _fixed(angle, *pivot):
+        m = matrix()
+        transform_point = lambda pt, combined: _transformed(pt, m, combined)
+    else:
+        transform_point = lambda pt, combined: Rotation(pt, pivot, rad(angle))
+    _transform_shapes(shapes, matrix, transform_point)
 
 
 def scale_shapes(shapes: Collection, cx: float, cy: float = None):
@@ -316,23 +566,29 @@ def scale_shapes(shapes: Collection, cx: float, cy: float = None):
         cx: The horizontal scaling factor.
         cy: The vertical scaling factor.  If missing, ``cx`` will be used.
 
+    Raises:
+        ValueError: If ``shapes`` includes a shape array and the
+          transformation changes over time.
+
     """
     cy = cx if cy is None else cy
-    if type(shapes) is list:
-        for shape in shapes:
-            scale_shapes(shape, cx, cy)
-    elif type(shapes) is Group:
-        scale_shapes(shapes.members, cx, cy)
-        scale_shapes(shapes.clip, cx, cy)
-    elif type(shapes) in [Polygon, Spline, Line]:
-        for i in range(len(shapes.points)):
-            shapes.points[i] = Scaling(shapes.points[i], cx, cy)
-    elif type(shapes) is Circle:
-        shapes.c = Scaling(shapes.c, cx, cy)
-        shapes.r = shapes.r * abs(cx)
+    _check_arrays(shapes, cx, cy)
+    _modified()
+    matrix = lambda: _scaling_matrix(fixed_value(cx), fixed_value(cy))
+    if _fixed(cx, cy):
+        m = matrix()
+        transform_point = lambda pt, combined: _transformed(pt, m, combined)
+    else:
+        transform_point = lambda pt, combined: Scaling(pt, cx, cy)
+    _transform_shapes(shapes, matrix, transform_point, cx)
+
+
+def _array_points(shapes: ShapeArray) -> np.ndarray:
+    """Get the array of points that locate a shape array's shapes."""
+    return shapes.centers if type(shapes) is CircleArray else shapes.vertices
 
 
-def coverage(obj: Collection) -> Union[SPolygon, SPoint, GeometryCollection]:
+def coverage(obj: Collection) -> Union["SPolygon", "SPoint", "GeometryCollection"]:
     """Create a shapely object.
 
     Used to calculate area/coverage.
@@ -345,6 +601,9 @@ def coverage(obj: Collection) -> Union[SPolygon, SPoint, GeometryCollection]:
         input shapes.
 
     """
+    from shapely.geometry import Polygon as SPolygon
+    from shapely.geometry import Point as SPoint
+
     if type(obj) is list:
         cover = coverage(obj[0])
         for o in obj[1:]:
@@ -369,6 +628,7 @@ def keep_shapes_inside(shapes: Sequence[Collection], boundary: Collection):
         boundary: One or more shapes giving the boundary.
 
     """
+    _modified()
     # Reverse so deleting items doesn't affect loop:
     for i, shape in reversed(list(enumerate(shapes))):
         if isinstance(shape, list):
@@ -392,6 +652,8 @@ def centroid(shape: Shape) -> Pnt:
         A point.
 
     """
+    from shapely.geometry import Polygon as SPolygon
+
     if type(shape) in [Polygon, Spline, Line]:
         return SPolygon([p.state() for p in shape.points]).centroid.coords[0]
     elif type(shape) is Circle:
@@ -408,6 +670,8 @@ def polygon_area(vertices: Sequence[Pnt]) -> float:
         The area.
 
     """
+    from shapely.geometry import Polygon as SPolygon
+
     return SPolygon(vertices).area
 
 
@@ -422,6 +686,9 @@ def sample_points_in_shape(shape: dict, n: int) -> List[Pnt]:
         The sampled points.
 
     """
+    from shapely.geometry import Polygon as SPolygon
+    from shapely.geometry import Point as SPoint
+
     bound = bounding_box(shape)
     points = []
     for i in range(n):
@@ -445,6 +712,8 @@ def keep_points_inside(points: Sequence[Pnt], boundary: Collection):
         boundary: One or more shapes giving the boundary.
 
     """
+    from shapely.geometry import Point as SPoint
+
     # reverse so deleting items doesn't affect loop
     for i, point in reversed(list(enumerate(points))):
         if not coverage(boundary).intersects(SPoint(point)):
@@ -462,6 +731,9 @@ def remove_hidden(shapes: Sequence[Collection]):
         shapes: A list of shapes.
 
     """
+    from shapely.geometry import Point as SPoint
+
+    _modified()
 
     def process_list(l, cover):
         for i, item in reversed(list(enumerate(l))):
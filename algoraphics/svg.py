@@ -5,35 +5,56 @@ write SVG files.
 
 """
 
+import gzip
+import io
 import numpy as np
-import string
-import subprocess
-
-# import cairosvg
-# import cairo
-import tempfile
-from moviepy.editor import ImageSequenceClip
+import os
+import re
+from collections import deque
+from itertools import chain
 # from inspect import signature
-from typing import Union, Sequence, Callable, Tuple
+from typing import Union, Sequence, Callable, Tuple, List, IO, Iterable, Iterator
 
+from . import draw, shapes
 from .main import flatten
-from .geom import endpoint, rotated_point, direction_to, distance, rad
 from .shapes import (
     scale_shapes,
     translate_shapes,
     rectangle,
+    bounding_box,
     Polygon,
     Spline,
     Line,
     Circle,
     Group,
+    ShapeArray,
+    CircleArray,
+    PolygonArray,
+    LineArray,
 )
 from .color import Color
-from .param import fixed_value, Param
+from .param import (
+    fixed_value,
+    is_static,
+    snapshot,
+    restore,
+    Param,
+    _precomputed,
+    _static,
+)
+from .raster import (
+    rasterize,
+    rasterize_array,
+    write_bytes,
+    write_png_rows,
+    composite,
+    Backend,
+)
 
 # Number = Union[int, float]
 # Point = Tuple[Number, Number]
 Pnt = Tuple[float, float]
+Bounds = Tuple[float, float, float, float]
 
 
 class Canvas:
@@ -44,107 +65,460 @@ class Canvas:
         height: The canvas height.
         background: The background color.  If None, background will be
           transparent.
+        backend: The raster backend used to create PNGs, either the
+          name of one in ``raster_backends`` or a function.  If None,
+          cairosvg is used when available, otherwise ImageMagick.  If
+          "cairo", shapes are drawn directly with cairo, without
+          generating SVG (see ``draw``).
 
     """
 
-    def __init__(self, width: float, height: float, background: Color = "white"):
+    def __init__(
+        self,
+        width: float,
+        height: float,
+        background: Color = "white",
+        backend: Backend = None,
+    ):
         self.width = width
         self.height = height
         self.objects = []
         self.background = background
+        self.backend = backend
         self.t = 0
-        # I could cache the SVG string, but how to know if it needs to
-        # be updated?
-        # self.svg = None
+        # SVG strings by timepoint, discarded when the canvas or its
+        # shapes are modified.
+        self._svg_cache = {}
+        self._cache_key = None
+        self._bg = None
+        self._bg_key = None
+
+    def __getstate__(self) -> dict:
+        """Get the canvas state for pickling, without the SVG cache.
+
+        The cache is keyed by a count of modifications in this
+        process, so it could be mistaken for a valid one elsewhere.
+
+        """
+        state = vars(self).copy()
+        state["_svg_cache"] = {}
+        state["_cache_key"] = None
+        return state
 
     def add(self, *object: Union[list, dict]):
         """Add one or more shapes or collections to the canvas."""
         for obj in object:
             self.objects.append(obj)
+        self.invalidate()
 
     def clear(self):
         """Remove all objects from the canvas."""
         self.objects = []
+        self.invalidate()
 
     def new(self, *object):
         """Clear the canvas and then add one or more shapes or collections."""
         self.objects = []
         self.add(*object)
 
-    def get_svg(self) -> str:
-        """Get the SVG representation of the canvas as a string."""
-        # obj = self.objects[:]
-        if self.background is not None and self.t == 0:
-            bg = rectangle(
+    def invalidate(self):
+        """Discard the cached SVG representations.
+
+        The canvas keeps one SVG per timepoint and set of output
+        options, e.g. the unoptimized SVG returned by ``get_svg`` and
+        rasterized by ``png`` separately from the optimized SVG
+        written by ``svg``.  Changes made with canvas methods and with functions
+        like ``set_style`` or ``translate_shapes`` are detected
+        automatically.  Call this after modifying shapes or
+        ``objects`` directly.
+
+        """
+        self._svg_cache = {}
+
+    def snapshot(self) -> dict:
+        """Record the current timepoint and the evaluation state of the objects.
+
+        Returns:
+            A snapshot for ``restore``, which can be pickled (see
+            ``param.snapshot``).
+
+        """
+        return dict(t=self.t, objects=snapshot(self._all_objects()))
+
+    def restore(self, state: dict):
+        """Return to the timepoint and evaluation state of a snapshot.
+
+        Args:
+            state: A snapshot from ``Canvas.snapshot`` of this canvas,
+              or of one with objects constructed the same way.
+
+        """
+        restore(self._all_objects(), state["objects"])
+        self.t = state["t"]
+        self.invalidate()
+
+    def _all_objects(self) -> list:
+        """Get the canvas objects preceded by the background, if any."""
+        if self.background is None:
+            return self.objects
+        # Reuse the background shape so its state persists across frames.
+        key = (self.width, self.height, self.background)
+        if self._bg_key != key:
+            self._bg = rectangle(
                 bounds=(-1, -1, self.width + 1, self.height + 1), fill=self.background
             )
-            self.objects.insert(0, bg)
-        return svg_string(self.objects, self.width, self.height, self.t)
+            self._bg_key = key
+        return [self._bg] + self.objects
+
+    def _cached_svg(self, options: dict) -> Union[str, None]:
+        """Get the cached SVG for the current timepoint if still valid.
+
+        Args:
+            options: Keyword arguments for ``svg_fragments``.
+
+        """
+        key = (shapes._modifications, self.width, self.height, self.background)
+        if key != self._cache_key:
+            self._svg_cache = {}
+            self._cache_key = key
+        return self._svg_cache.get(self._svg_key(options))
+
+    def _svg_key(self, options: dict) -> tuple:
+        """Get the cache key for the current timepoint and SVG options.
+
+        Options that aren't given have their ``svg_fragments`` defaults.
+
+        """
+        return (
+            self.t,
+            options.get("css_classes", False),
+            options.get("optimize", False),
+            options.get("precision"),
+        )
+
+    def get_svg(self, css_classes: bool = False, optimize: bool = False) -> str:
+        """Get the SVG representation of the canvas as a string.
 
-    def svg(self, file_name: str, optimize: bool = True):
+        The result is cached, so repeated calls only serialize the
+        canvas once per timepoint.  Each combination of options is
+        cached separately.  ``png`` and ``to_array`` rasterize the
+        SVG returned with the default options, and ``svg`` writes the
+        one returned with ``optimize=True``, so those share this
+        serialization.
+
+        Args:
+            css_classes: Whether to define each distinct style once
+              as a CSS class instead of writing inline styles.
+            optimize: Whether to minimize the SVG size (see
+              ``svg_fragments``).
+
+        """
+        options = dict(css_classes=css_classes, optimize=optimize)
+        svg = self._cached_svg(options)
+        if svg is None:
+            objects = self._all_objects()
+            svg = svg_string(objects, self.width, self.height, self.t, **options)
+            self._svg_cache[self._svg_key(options)] = svg
+        return svg
+
+    def svg(
+        self,
+        file_name: Union[str, IO],
+        optimize: bool = True,
+        compress: bool = None,
+        css_classes: bool = False,
+        precision: int = None,
+    ):
         """Write the canvas to an SVG file.
 
+        The SVG is streamed to the file as it is generated.  With the
+        default options, it is also cached unless it is very large, so
+        writing it again serializes the canvas once.  ``png`` and
+        ``to_array`` rasterize the unoptimized SVG instead (see
+        ``get_svg``).
+
         Args:
-            file_name: The file name to write to.
-            optimize: Whether to optimize the SVG file using svgo.
+            file_name: The file name or file object to write to.
+            optimize: Whether to minimize the file size while writing
+              it (see ``svg_fragments``).
+            compress: Whether to gzip the output (i.e. write SVGZ).
+              If None, output is compressed if the file name ends with
+              '.svgz'.
+            css_classes: Whether to define each distinct style once
+              as a CSS class instead of writing inline styles.
+            precision: The number of decimal places to round numbers
+              to.  If None, numbers are written in full, unless
+              ``optimize`` is True, in which case 2 is used.
 
         """
-        svg = self.get_svg()
-        open(file_name, "w").write(svg)
-        if optimize:
-            subprocess.run(["svgo", "--quiet", "--precision=2", "--input=" + file_name])
+        if compress is None:
+            compress = isinstance(file_name, str) and file_name.lower().endswith(".svgz")
+        options = dict(css_classes=css_classes, optimize=optimize, precision=precision)
+        svg = self._cached_svg(options)
+        if svg is None:
+            objects = self._all_objects()
+            fragments = svg_fragments(objects, self.width, self.height, self.t, **options)
+            if (css_classes, optimize, precision) == (False, True, None):
+                fragments = self._caching(fragments, options)
+        else:
+            fragments = [svg]
+        _write_text(fragments, file_name, compress)
+
+    def _caching(self, fragments: Iterable[str], options: dict) -> Iterator[str]:
+        """Pass SVG fragments through, caching the whole SVG.
+
+        The SVG isn't cached if it is longer than
+        ``_stream_cache_limit``, so very large canvases are still
+        streamed without being held in memory.
+
+        """
+        kept = []
+        size = 0
+        for fragment in fragments:
+            if kept is not None:
+                size += len(fragment)
+                if size > _stream_cache_limit:
+                    kept = None
+                else:
+                    kept.append(fragment)
+            yield fragment
+        if kept is not None:
+            self._svg_cache[self._svg_key(options)] = "".join(kept)
+
+    def _render_svg(self) -> str:
+        """Get the SVG to rasterize for the current timepoint.
+
+        This is the unoptimized, full-precision SVG returned by
+        ``get_svg``, so rounding doesn't change the pixels, and the
+        canvas is serialized once for both.
 
-    def png(self, file_name: str, force_RGBA: bool = False):
+        """
+        return self.get_svg()
+
+    def png(
+        self,
+        file_name: Union[str, IO] = None,
+        force_RGBA: bool = False,
+        backend: Backend = None,
+    ) -> Union[bytes, None]:
         """Write the canvas to a PNG file.
 
         Args:
-            file_name: The file name to write to.
+            file_name: The file name or binary file object to write
+              to.  If None, the PNG data is returned instead.
             force_RGBA: Whether to write PNG in RGBA colorspace, even
-              if it could be grayscale.  This is for, e.g., moviepy
-              which requires all frame images to be in the same
-              colorspace.
+              if it could be grayscale.  This is useful when all frame
+              images of an animation must be in the same colorspace.
+            backend: The raster backend to use (see ``rasterize``).
+              If None, the canvas's backend is used.
+
+        """
+        backend = self.backend if backend is None else backend
+        if backend == "cairo":
+            png = draw.draw_png(self._all_objects(), self.width, self.height, self.t)
+        else:
+            png = rasterize(self._render_svg(), backend, force_RGBA=force_RGBA)
+        if file_name is None:
+            return png
+        write_bytes(png, file_name)
+
+    def animated_svg(
+        self,
+        file_name: Union[str, IO],
+        fps: int,
+        n_frames: int = None,
+        seconds: float = None,
+        optimize: bool = True,
+        compress: bool = None,
+        css_classes: bool = False,
+        precision: int = None,
+    ):
+        """Write a dynamic graphic to a single animated SVG file.
+
+        Shapes are evaluated for every frame, and only the values that
+        change are written more than once, as SMIL animations.  This
+        is often much smaller and faster than rendering a GIF.
+
+        Args:
+            file_name: The file name or file object to write to.
+            fps: Frames per second of the animation.
+            n_frames: Number of frames to generate.
+            seconds: Specify length of the animation in seconds
+              instead of number of frames.
+            optimize: Whether to minimize the file size (see ``svg``).
+            compress: Whether to gzip the output (i.e. write SVGZ).
+              If None, output is compressed if the file name ends with
+              '.svgz'.
+            css_classes: Whether to define each distinct style once
+              as a CSS class instead of writing inline styles.
+            precision: The number of decimal places to round numbers
+              to (see ``svg``).
 
         """
-        svg = self.get_svg()
-        # cairosvg.svg2png(svg, write_to=file_name)
-        handle, path = tempfile.mkstemp()
-        open(handle, "w").write(svg)
-        frmt = "PNG32:" if force_RGBA else ""
-        # subprocess.run(["convert", "-background None", path, frmt + file_name])
-        # For some reason it has to be this way to use '-background None':
-        subprocess.run(
-            "convert -background None {} {}".format(path, frmt + file_name), shell=True
+        if n_frames is None:
+            n_frames = int(round(seconds * fps))
+        if compress is None:
+            compress = isinstance(file_name, str) and file_name.lower().endswith(".svgz")
+        fragments = animated_svg_fragments(
+            self._all_objects(),
+            self.width,
+            self.height,
+            fps,
+            n_frames,
+            self.t,
+            css_classes,
+            optimize,
+            precision,
         )
-        # I tried writing directly to PNG, but it was much slower:
-        # surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, self.width, self.height)
-        # ctx = cairo.Context(surface)
-        # for obj in flatten(self.objects):
-        #     # if "stroke" in obj.style and obj.style["stroke"] is not None:
-                
-        #     if type(obj) is Polygon:
-        #         pts = [p.state() for p in obj.points]
-        #         ctx.move_to(*pts[0])
-        #         for pt in pts[1:] + [pts[0]]:
-        #             ctx.line_to(*pt)
-        #         ctx.stroke()
-        #     elif type(obj) is Line:
-        #         pts = [p.state() for p in obj.points]
-        #         ctx.move_to(*pts[0])
-        #         for pt in pts[1:]:
-        #             ctx.line_to(*pt)
-        #         ctx.stroke()
-        #     surface.write_to_png(file_name)
-
-    def _write_frames(self, n_frames: int, fps: int) -> Sequence[str]:
-        files = []
-        for i in range(n_frames):
-            handle, path = tempfile.mkstemp(suffix=".png")
-            self.png(path, force_RGBA=True)
-            files.append(path)
-            self.t += 1
-        return files
+        _write_text(fragments, file_name, compress)
+        self.t += n_frames
+
+    def tiled_png(
+        self,
+        file_name: Union[str, IO],
+        tile_size: int = 1024,
+        scale: float = 1,
+        workers: int = None,
+        backend: Backend = None,
+    ):
+        """Rasterize the canvas in tiles and stitch them into a PNG file.
+
+        Each tile is rendered separately, in parallel, from an SVG
+        containing only the objects that can appear in it.  Rows of
+        tiles are written to the file as they are completed, so memory
+        use doesn't grow with the size of the canvas.
+
+        Args:
+            file_name: The file name or binary file object to write to.
+            tile_size: The width and height of each tile in pixels.
+            scale: Factor by which to scale the output dimensions.
+            workers: Number of processes used to rasterize tiles.  If
+              None, the number of CPUs is used.
+            backend: The raster backend to use (see ``rasterize``).
+              If None, the canvas's backend is used.
+
+        """
+        backend = self.backend if backend is None else backend
+        if backend == "cairo":
+            backend = None  # Tiles are rasterized from SVG.
+        objects = self._all_objects()
+        _evaluate(objects, self.t)  # Draw random values in drawing order.
+        width, height, n_cols, n_rows = _tile_grid(
+            self.width, self.height, tile_size, scale
+        )
+        svgs = (
+            svg
+            for row, col, svg in _tile_svgs(
+                objects, self.width, self.height, tile_size, scale, self.t
+            )
+        )
+        tiles = _frame_arrays(svgs, backend, workers)
+
+        def rows():
+            for row in range(n_rows):
+                yield np.concatenate([next(tiles) for col in range(n_cols)], axis=1)
+
+        write_png_rows(rows(), file_name, width, height)
+
+    def png_pyramid(
+        self,
+        directory: str,
+        tile_size: int = 256,
+        workers: int = None,
+        backend: Backend = None,
+    ):
+        """Rasterize the canvas as a pyramid of tiles for zoomable viewers.
+
+        Tiles are written to ``{directory}/{z}/{x}_{y}.png``, where
+        ``x`` and ``y`` are the column and row of the tile, counting
+        from the top left.  Level 0 fits the whole canvas in one tile,
+        and each subsequent level doubles the resolution, up to full
+        size.  Every level is rendered from the vector graphics rather
+        than by downsampling.
+
+        Args:
+            directory: The directory to write tiles to.
+            tile_size: The width and height of each tile in pixels.
+            workers: Number of processes used to rasterize tiles.  If
+              None, the number of CPUs is used.
+            backend: The raster backend to use (see ``rasterize``).
+              If None, the canvas's backend is used.
+
+        """
+        backend = self.backend if backend is None else backend
+        if backend == "cairo":
+            backend = None  # Tiles are rasterized from SVG.
+        objects = self._all_objects()
+        _evaluate(objects, self.t)  # Draw random values in drawing order.
+        size = max(self.width, self.height)
+        levels = max(0, int(np.ceil(np.log2(size / tile_size))))
+
+        def jobs():
+            for z in range(levels + 1):
+                os.makedirs(os.path.join(directory, str(z)), exist_ok=True)
+                scale = 2.0 ** (z - levels)
+                for row, col, svg in _tile_svgs(
+                    objects, self.width, self.height, tile_size, scale, self.t
+                ):
+                    path = os.path.join(directory, str(z), "{}_{}.png".format(col, row))
+                    yield svg, backend, path
+
+        for result in _ordered_map(_write_tile, jobs(), workers):
+            pass
+
+    def to_array(
+        self, scale: float = 1, dtype: type = np.uint8, backend: Backend = None
+    ) -> np.ndarray:
+        """Rasterize the canvas to an array of RGBA pixel values.
+
+        With the cairosvg backend the pixels are read directly from
+        the rendered image, without encoding a PNG.
+
+        Args:
+            scale: Factor by which to scale the output dimensions.
+            dtype: The type of the output values.  Integer arrays hold
+              values from 0 to 255, and float arrays from 0 to 1.
+            backend: The raster backend to use (see ``rasterize``).
+              If None, the canvas's backend is used.
+
+        Returns:
+            A height x width x 4 array.
+
+        """
+        backend = self.backend if backend is None else backend
+        if backend == "cairo":
+            objects = self._all_objects()
+            return draw.draw_array(objects, self.width, self.height, self.t, scale, dtype)
+        return rasterize_array(self._render_svg(), backend, scale, dtype)
+
+    def _drawn_frames(self, n_frames: int) -> Iterator[np.ndarray]:
+        """Draw successive timepoints directly with cairo."""
+        objects = self._all_objects()
+        for t in _precomputed(objects, self.t, self.t + n_frames):
+            yield draw.draw_array(objects, self.width, self.height, t)
+            self.t = t + 1
 
-    def gif(self, file_name: str, fps: int, n_frames: int = None, seconds: float = None):
+    def _frame_svgs(self, n_frames: int) -> Iterator[str]:
+        """Generate SVG strings for successive timepoints.
+
+        These bypass the cache so that it doesn't grow with the number
+        of frames.
+
+        """
+        objects = self._all_objects()
+        for t in _precomputed(objects, self.t, self.t + n_frames):
+            yield svg_string(objects, self.width, self.height, t)
+            self.t = t + 1
+
+    def gif(
+        self,
+        file_name: str,
+        fps: int,
+        n_frames: int = None,
+        seconds: float = None,
+        workers: int = 1,
+        split_static: bool = True,
+    ):
         """Create a GIF image of a dynamic graphic.
 
         Args:
@@ -153,31 +527,451 @@ class Canvas:
             n_frames: Number of frames to generate.
             seconds: Specify length of the GIF in seconds instead of
               number of frames.
+            workers: Number of processes used to rasterize frames.
+              Frame states are still computed in order by this
+              process.  If None, the number of CPUs is used.
+            split_static: Whether to rasterize static objects only
+              once (see ``video``).
+
+        """
+        self.video(file_name, fps, n_frames, seconds, workers, split_static)
+
+    def video(
+        self,
+        file_name: str,
+        fps: int,
+        n_frames: int = None,
+        seconds: float = None,
+        workers: int = 1,
+        split_static: bool = True,
+    ):
+        """Create a video (or GIF) of a dynamic graphic.
+
+        Frames are streamed to ffmpeg as they are rendered, so no
+        intermediate files are written.  The format is determined by
+        the file extension.
+
+        By default, the objects drawn before the first object that
+        changes after the first frame, and those drawn after the last
+        one, are rasterized once.  Only the objects in between are
+        rendered for later frames and composited with them in drawing
+        order.  Edges where static and dynamic
+        objects overlap may be antialiased slightly differently than
+        when each frame is rendered whole.
+
+        Args:
+            file_name: The file name to write to.
+            fps: Frames per second of the video.
+            n_frames: Number of frames to generate.
+            seconds: Specify length of the video in seconds instead of
+              number of frames.
+            workers: Number of processes used to rasterize frames.
+              Frame states are still computed in order by this
+              process.  If None, the number of CPUs is used.
+            split_static: Whether to rasterize static objects only
+              once.  If False, every frame is rendered in full.
 
         """
         if n_frames is None:
-            n_frames = seconds * fps
-        files = self._write_frames(n_frames, fps)
-        ImageSequenceClip(files, fps=fps).write_gif(file_name, logger=None)
+            n_frames = int(round(seconds * fps))
+        if split_static:
+            frames = self._layered_frames(n_frames, workers)
+        elif self.backend == "cairo":
+            frames = self._drawn_frames(n_frames)
+        else:
+            svgs = self._frame_svgs(n_frames)
+            frames = _frame_arrays(svgs, self.backend, workers)
+        _encode_frames(frames, file_name, fps)
+
+    def _layered_frames(self, n_frames: int, workers: int = 1) -> Iterator[np.ndarray]:
+        """Render frames, rasterizing static bands of objects only once.
+
+        All bands (see ``_layer_bands``) are rendered for the first
+        frame, in drawing order, so random values are generated just
+        as for whole frames.  After that, static bands are neither
+        evaluated nor rendered again.
+
+        """
+        bands = _layer_bands(self._all_objects())
+
+        # With the cairo backend, bands are drawn directly in order.
+        direct = self.backend == "cairo"
+        render = draw.draw_array if direct else svg_string
+
+        def band_layers():
+            dynamic = [objects for static, objects in bands if not static]
+            for t in _precomputed(dynamic, self.t, self.t + n_frames):
+                for static, objects in bands:
+                    if t == self.t or not static:
+                        yield render(objects, self.width, self.height, t)
+
+        layers = band_layers()
+        if not direct:
+            layers = _frame_arrays(layers, self.backend, workers)
+        static_layers = {}
+        for i in range(n_frames):
+            frame = None
+            for j, (static, objects) in enumerate(bands):
+                if i > 0 and static:
+                    layer = static_layers[j]
+                else:
+                    layer = next(layers)
+                    if static:
+                        static_layers[j] = layer
+                frame = layer if frame is None else composite(frame, layer)
+            yield frame
+        self.t += n_frames
+
+
+def _layer_bands(objects: Union[list, dict]) -> List[Tuple[bool, list]]:
+    """Split objects into static and dynamic bands in drawing order.
+
+    Only the static objects drawn before the first dynamic object and
+    after the last one form static bands.  Static objects between
+    dynamic ones are rendered with them every frame, since compositing
+    many separate layers costs more than rendering them.
+
+    Returns:
+        A list of up to three (static, objects) tuples in drawing
+        order.  If the first and last objects are both dynamic, it is
+        a single dynamic band, so frames are rendered whole.
+
+    """
+    objects = flatten(objects)
+    memo = {}
+    dynamic = [i for i, obj in enumerate(objects) if not _static(obj, memo)]
+    if len(dynamic) == 0:
+        return [(True, objects)] if len(objects) > 0 else []
+    first, last = dynamic[0], dynamic[-1] + 1
+    bands = [
+        (True, objects[:first]),
+        (False, objects[first:last]),
+        (True, objects[last:]),
+    ]
+    return [band for band in bands if len(band[1]) > 0]
+
+
+def _frame_arrays(
+    svgs: Iterable[str], backend: Backend = None, workers: int = 1
+) -> Iterator[np.ndarray]:
+    """Rasterize a sequence of SVG frames, preserving their order.
+
+    Args:
+        svgs: SVG strings, which are consumed lazily so that frame
+          states can be computed sequentially while earlier frames
+          are rasterized.
+        backend: The raster backend.  To use more than one worker it
+          must be a backend name or a picklable (module-level)
+          function.
+        workers: Number of processes to rasterize with.  If None, the
+          number of CPUs is used.
+
+    Returns:
+        An iterator of RGBA pixel arrays for each frame.
+
+    """
+    return _ordered_map(rasterize_array, ((svg, backend) for svg in svgs), workers)
+
+
+def _ordered_map(function: Callable, args: Iterable[tuple], workers: int = 1) -> Iterator:
+    """Call a function in worker processes, yielding results in order.
+
+    Args:
+        function: A picklable (module-level) function.
+        args: Tuples of arguments, which are consumed lazily.
+        workers: Number of processes to use.  If None, the number of
+          CPUs is used.  If 1, calls are made in this process.
+
+    """
+    workers = os.cpu_count() if workers is None else workers
+    if workers == 1:
+        for arg in args:
+            yield function(*arg)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as pool:
+        # Bound the number of pending calls to limit memory use.
+        max_pending = 2 * workers
+        pending = deque()
+        for arg in args:
+            pending.append(pool.submit(function, *arg))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while len(pending) > 0:
+            yield pending.popleft().result()
+
+
+def _write_tile(svg: str, backend: Backend, path: str):
+    """Rasterize an SVG string and write it to a PNG file."""
+    write_bytes(rasterize(svg, backend, force_RGBA=True), path)
+
+
+def _tile_grid(w: float, h: float, tile_size: int, scale: float) -> Tuple[int, int, int, int]:
+    """Get the pixel dimensions and numbers of columns and rows of tiles."""
+    width = max(1, int(np.ceil(w * scale)))
+    height = max(1, int(np.ceil(h * scale)))
+    n_cols = int(np.ceil(width / tile_size))
+    n_rows = int(np.ceil(height / tile_size))
+    return width, height, n_cols, n_rows
+
+
+def _tile_svgs(
+    objects: Union[list, dict],
+    w: float,
+    h: float,
+    tile_size: int,
+    scale: float = 1,
+    t: int = 0,
+) -> Iterator[Tuple[int, int, str]]:
+    """Generate an SVG document for each tile of a canvas.
+
+    Each document views one tile of the canvas and includes only the
+    objects whose drawn area overlaps it.  Objects are indexed by tile
+    first, so each tile only checks those near it.
+
+    Args:
+        objects: A (nested) collection of objects.
+        w: Width of the canvas.
+        h: Height of the canvas.
+        tile_size: The width and height of each tile in pixels.
+        scale: The number of pixels per canvas unit.
+        t: The timepoint to render.
+
+    Returns:
+        An iterator of (row, column, SVG) tuples, row by row from the
+        top left.
+
+    """
+    items = [(obj, _drawn_bounds(obj, t)) for obj in _drawn_objects(objects)]
+    items = [(obj, b) for obj, b in items if b is not None]
+    width, height, n_cols, n_rows = _tile_grid(w, h, tile_size, scale)
+    # Index the objects by the tiles they may overlap, keeping them in
+    # drawing order.  The ranges are widened by a tile to allow for
+    # rounding, and overlaps are checked exactly below.
+    tiles = {}
+    units = tile_size / scale
+    for obj, b in items:
+        cols = range(
+            max(0, int(np.floor(b[0] / units)) - 1),
+            min(n_cols, int(np.ceil(b[2] / units)) + 1),
+        )
+        rows = range(
+            max(0, int(np.floor((h - b[3]) / units)) - 1),
+            min(n_rows, int(np.ceil((h - b[1]) / units)) + 1),
+        )
+        for row in rows:
+            for col in cols:
+                tiles.setdefault((row, col), []).append((obj, b))
+    for row in range(n_rows):
+        for col in range(n_cols):
+            tile_w = min(tile_size, width - col * tile_size)
+            tile_h = min(tile_size, height - row * tile_size)
+            # The tile's view, with y counted from the top:
+            view = (
+                col * tile_size / scale,
+                row * tile_size / scale,
+                tile_w / scale,
+                tile_h / scale,
+            )
+            # Its bounds in canvas coordinates:
+            x0, x1 = view[0], view[0] + view[2]
+            y0, y1 = h - view[1] - view[3], h - view[1]
+            inside = [
+                obj
+                for obj, b in tiles.pop((row, col), [])
+                if b[0] < x1 and b[2] > x0 and b[1] < y1 and b[3] > y0
+            ]
+            header = _header(tile_w, tile_h, True, view, h)
+            # Numbers are written in full so rounding doesn't change
+            # the pixels.
+            doc = _Document()
+            svg = "".join(_compact(_document_fragments(inside, header, doc, t)))
+            yield row, col, svg
+
+
+def _evaluate(objects: Union[list, dict], t: int = 0):
+    """Evaluate objects at a timepoint without writing them as SVG.
+
+    Shapes are evaluated in drawing order, styles before geometry, so
+    random values are drawn just as when writing a document.
+
+    """
+    for obj in flatten(objects):
+        if type(obj) is Group:
+            _evaluate(obj.clip, t)
+            _evaluate(obj.members, t)
+        elif type(obj) is Circle:
+            _write_style(obj, t)
+            obj.c.state(t)
+            fixed_value(obj.r, t)
+        elif not isinstance(obj, ShapeArray):  # These are static.
+            _write_style(obj, t)
+            for pt in obj.points:
+                pt.state(t)
+
+
+def _drawn_objects(objects: Union[list, dict]) -> Iterator:
+    """Iterate over objects, replacing plain groups with their members.
+
+    Groups with no clip or filter don't affect how their members are
+    drawn, so their members can be culled individually.
+
+    """
+    for obj in flatten(objects):
+        if type(obj) is Group and len(obj.clip) == 0 and obj.filter is None:
+            yield from _drawn_objects(obj.members)
+        else:
+            yield obj
+
+
+def _drawn_bounds(obj: dict, t: int = 0) -> Union[Bounds, None]:
+    """Find the area an object can draw on.
+
+    Unlike ``bounding_box``, this includes margins for strokes and
+    filters and the control points of splines.
+
+    Returns:
+        The min x, min y, max x, and max y coordinates, or None if the
+        object draws nothing.
+
+    """
+    if type(obj) is Group:
+        parts = obj.clip if len(obj.clip) > 0 else obj.members
+        boxes = [_drawn_bounds(o, t) for o in flatten(parts)]
+        boxes = [b for b in boxes if b is not None]
+        if len(boxes) == 0:
+            return None
+        b = list(zip(*boxes))
+        margin = 0
+        if obj.filter is not None and "stdev" in obj.filter:
+            margin = 3 * obj.filter["stdev"]
+        return (min(b[0]) - margin, min(b[1]) - margin, max(b[2]) + margin, max(b[3]) + margin)
+
+    if type(obj) is Spline:
+        pts = [pt.state(t) for pt in obj.points]
+        if len(pts) < 2:
+            return None
+        start, c1, curves = _spline_controls(pts, obj.smoothing, obj.circular)
+        pts = np.vstack([start, c1, curves.reshape(-1, 2)])
+        x0, y0 = pts.min(axis=0)
+        x1, y1 = pts.max(axis=0)
+    elif type(obj) in (Polygon, Line) and len(obj.points) == 0:
+        return None
+    elif isinstance(obj, ShapeArray) and len(obj) == 0:
+        return None
+    else:
+        x0, y0, x1, y1 = bounding_box(obj, t)
+    width = obj.style.get("stroke-width", 1)
+    if isinstance(width, (list, np.ndarray)):  # Element-wise values.
+        width = max(width)
+    # Allow for mitered corners and antialiasing:
+    margin = 2 * fixed_value(width, t) + 1
+    return (x0 - margin, y0 - margin, x1 + margin, y1 + margin)
+
+
+def _function_frames(
+    function: Callable, n_frames: int, workers: int = 1
+) -> Iterator[np.ndarray]:
+    """Rasterize canvases generated by repeated calls to ``function``.
 
+    The first canvas's raster backend is used for all frames.
 
-def _match_dict(dicts: Sequence[dict], d: dict) -> Union[int, None]:
-    """Return index of dict in ``dicts`` matching ``d``.
+    """
+    canvas = function()
+    if canvas.backend == "cairo":
+        rest = (function().to_array() for i in range(n_frames - 1))
+        return chain([canvas.to_array()], rest)
+    svgs = chain([canvas.get_svg()], (function().get_svg() for i in range(n_frames - 1)))
+    return _frame_arrays(svgs, canvas.backend, workers)
+
+
+def _encode_frames(frames: Iterable[np.ndarray], file_name: str, fps: int):
+    """Stream RGBA frames into an ffmpeg encoder.
+
+    Frames are piped to ffmpeg one at a time, so memory use does not
+    grow with the number of frames.  GIFs get a palette computed for
+    each frame.
+
+    Args:
+        frames: RGBA arrays, all of the same size.
+        file_name: The file name to write to.  The extension
+          determines the format.
+        fps: Frames per second.
+
+    """
+    import imageio_ffmpeg
+
+    frames = iter(frames)
+    first = next(frames)
+    size = (first.shape[1], first.shape[0])
+    if file_name.lower().endswith(".gif"):
+        palette = "split[a][b];[a]palettegen=stats_mode=single[p];[b][p]paletteuse=new=1"
+        options = dict(
+            codec="gif",
+            pix_fmt_out="pal8",
+            quality=None,
+            macro_block_size=1,
+            output_params=["-vf", palette],
+        )
+    else:
+        options = dict(macro_block_size=2)
+    writer = imageio_ffmpeg.write_frames(
+        file_name, size, pix_fmt_in="rgba", fps=fps, **options
+    )
+    writer.send(None)  # Start the generator.
+    try:
+        writer.send(first)
+        for frame in frames:
+            writer.send(frame)
+    finally:
+        writer.close()
+
+
+# The longest SVG, in characters, that ``Canvas.svg`` keeps while
+# streaming it, for reuse by other output formats.
+_stream_cache_limit = 2 ** 24
+
+# Matches ".0" at the end of a formatted number.
+_trailing_zero = re.compile(r"\.0(?= |$)")
+
+
+def _format_coords(coords: Union[np.ndarray, Sequence], precision: int = None) -> str:
+    """Write coordinates as space-separated numbers.
+
+    Args:
+        coords: An array or list of points (or other number tuples).
+        precision: Decimal places to round numbers to, or None to
+          write them in full.
 
-    Returns None if no match.
+    Returns:
+        The numbers in order, with trailing zeros omitted.
 
     """
-    for i in range(len(dicts)):
-        if dicts[i] == d:
-            return i
-    return None
+    if isinstance(coords, np.ndarray) or len(coords) > 8:
+        # Vectorized rounding is faster for all but small shapes.
+        values = np.asarray(coords, dtype=float)
+        if precision is not None:
+            values = np.round(values, precision) + 0.0  # Adding 0.0 avoids "-0".
+        values = values.ravel().tolist()
+    elif precision is None:
+        values = [float(x) for xy in coords for x in xy]
+    else:
+        values = [round(float(x), precision) + 0.0 for xy in coords for x in xy]
+    return _trailing_zero.sub("", " ".join(map(repr, values)))
 
 
 def _spline_path(
-    points: Sequence[Pnt], smoothing: float = 0.3, circular: bool = False
+    points: Sequence[Pnt],
+    smoothing: float = 0.3,
+    circular: bool = False,
+    precision: int = None,
 ) -> str:
     """Generate path string for spline.
 
+    The path uses relative commands, with repeated commands implicit,
+    to keep it compact.
+
     Args:
         points: A list of points.
         smoothing: The distance to the control point relative to the
@@ -186,138 +980,579 @@ def _spline_path(
         circular: If False, spline ends reasonably at the first and
           last points.  If True, the ends of the spline will connect
           smoothly.
+        precision: Decimal places to round numbers to, or None to
+          write them in full.
 
     Returns:
         An SVG path.
 
     """
-    # Add control points at the ends:
+    start, c1, curves = _spline_controls(points, smoothing, circular)
+    return _path_data(start, c1, curves, precision)
+
+
+def _spline_controls(
+    points: Union[np.ndarray, Sequence[Pnt]],
+    smoothing: float = 0.3,
+    circular: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute the bezier control points of a spline.
+
+    Each point gets a control point on either side, parallel to the
+    line between its neighbors, with all points computed at once.
+
+    Args:
+        points: A list or n x 2 array of points.
+        smoothing: The distance to the control point relative to the
+          distance to the adjacent point.
+        circular: Whether the ends of the spline connect smoothly.
+
+    Returns:
+        The starting point, the first control point of the first
+        curve, and an n x 2 x 2 array with the second control point
+        and endpoint of each curve (see ``_path_data``).
+
+    """
+    pts = np.asarray(points, dtype=float)
+    # Add points at the ends to determine the end control points:
     if circular:
-        points = [points[-1]] + points + [points[0], points[1]]
+        pts = np.concatenate([pts[-1:], pts, pts[:2]])
     else:
-        p0 = rotated_point(points[1], points[0], np.pi)
-        p_last = rotated_point(points[-2], points[-1], np.pi)
-        points = [p0] + points + [p_last]
+        pts = np.concatenate([2 * pts[:1] - pts[1:2], pts, 2 * pts[-1:] - pts[-2:-1]])
 
-    path = "M {} {}".format(*points[1])
+    # Offset from each interior point to the control point preceding it:
+    offsets = smoothing * (pts[:-2] - pts[2:])
+    c1 = pts[1] - offsets[0]
+    curves = np.stack([pts[2:-1] + offsets[1:], pts[2:-1]], axis=1)
+    return pts[1], c1, curves
 
-    direction = direction_to(points[0], points[2])
-    dist = distance(points[0], points[2])
-    c1 = endpoint(points[1], rad(direction), smoothing * dist)
 
-    direction = direction_to(points[3], points[1])
-    dist = distance(points[3], points[1])
-    c2 = endpoint(points[2], rad(direction), smoothing * dist)
-    path += "C {} {} {} {} {} {}".format(*c1, *c2, *points[2])
+def _path_data(
+    start: np.ndarray, c1: np.ndarray, curves: np.ndarray, precision: int = None
+) -> str:
+    """Encode a chain of smooth cubic bezier curves as path data.
 
-    for i in range(3, len(points) - 1):
-        direction = direction_to(points[i + 1], points[i - 1])
-        dist = distance(points[i + 1], points[i - 1])
-        c = endpoint(points[i], rad(direction), smoothing * dist)
-        path += "S {} {} {} {}".format(*c, *points[i])
-    return path
+    Args:
+        start: The starting point.
+        c1: The first control point of the first curve.
+        curves: An n x 2 x 2 array with the second control point and
+          the endpoint of each curve.  The first control point of
+          each subsequent curve is the reflection of the previous
+          curve's second control point.
+        precision: Decimal places to round numbers to, or None.
 
+    Returns:
+        Path data using a relative ``c`` command followed by implicitly
+        repeated relative ``s`` commands.
 
-def _write_polygon(shape: Polygon, mods: str, t: int = 0) -> str:
-    """Generate the SVG representation of a polygon."""
+    """
+    if precision is not None:
+        start = np.round(start, precision)
+        c1 = np.round(c1, precision)
+        curves = np.round(curves, precision)
+    # Make coordinates relative to the end of the previous curve:
+    ends = curves[:, 1]
+    prev = np.vstack([start, ends[:-1]])
+    c1 = c1 - start
+    curves = curves - prev[:, np.newaxis, :]
+    if precision is not None:
+        # Remove floating point error from subtraction.
+        c1 = np.round(c1, precision)
+        curves = np.round(curves, precision)
+    d = "M" + _format_coords(start, precision)
+    d += "c" + _format_coords(np.concatenate([c1, curves[0].ravel()]), precision)
+    if len(curves) > 1:
+        d += "s" + _format_coords(curves[1:], precision)
+    return d.replace(" -", "-")
+
+
+def _polygon_attributes(shape: Polygon, doc: "_Document", t: int = 0) -> Tuple[str, dict]:
+    """Get the SVG element and geometry attributes of a polygon."""
     pts = [pt.state(t) for pt in shape.points]
-    points = " ".join(["{},{}".format(x[0], x[1]) for x in pts])
-    return '<polygon points="{}" {}/>\n'.format(points, mods)
+    return "polygon", {"points": _format_coords(pts, doc.precision)}
 
 
-def _write_spline(shape: Spline, mods: str, t: int = 0) -> str:
-    """Generate the SVG representation of a spline path."""
+def _spline_attributes(shape: Spline, doc: "_Document", t: int = 0) -> Tuple[str, dict]:
+    """Get the SVG element and geometry attributes of a spline path."""
     pts = [pt.state(t) for pt in shape.points]
     if len(pts) < 2:
-        return ""
-    d = _spline_path(pts, shape.smoothing, shape.circular)
-    return '<path d="{}" {}/>\n'.format(d, mods)
+        return None, {}
+    d = _spline_path(pts, shape.smoothing, shape.circular, doc.precision)
+    return "path", {"d": d}
 
 
-def _write_circle(shape: Circle, mods: str, t: int = 0) -> str:
-    """Generate the SVG representation of a circle."""
+def _circle_attributes(shape: Circle, doc: "_Document", t: int = 0) -> Tuple[str, dict]:
+    """Get the SVG element and geometry attributes of a circle."""
+    num = doc.num
     c = shape.c.state(t)
     r = fixed_value(shape.r, t)
-    return '<circle cx="{}" cy="{}" r="{}" {}/>\n'.format(c[0], c[1], r, mods)
+    return "circle", {"cx": num(c[0]), "cy": num(c[1]), "r": num(r)}
 
 
-def _write_line(shape: Line, mods: str, t: int = 0) -> str:
-    """Generate the SVG representation of a line or polyline."""
+def _line_attributes(shape: Line, doc: "_Document", t: int = 0) -> Tuple[str, dict]:
+    """Get the SVG element and geometry attributes of a line or polyline."""
+    num = doc.num
     pts = [pt.state(t) for pt in shape.points]
     if len(pts) == 2:
-        return '<line x1="{}" y1="{}" x2="{}" y2="{}" {}/>\n'.format(
-            pts[0][0], pts[0][1], pts[1][0], pts[1][1], mods
-        )
+        return "line", {
+            "x1": num(pts[0][0]),
+            "y1": num(pts[0][1]),
+            "x2": num(pts[1][0]),
+            "y2": num(pts[1][1]),
+        }
     else:
-        points = " ".join(["{},{}".format(x[0], x[1]) for x in shape.points])
-        return '<polyline points="{}" fill="none" {}/>\n'.format(points, mods)
+        points = _format_coords(pts, doc.precision)
+        return "polyline", {"points": points, "fill": "none"}
 
 
-def _write_group(
-    shape: Group, mods: str, defs: Sequence[str], filters: Sequence[dict], t: int = 0
-) -> str:
-    """Generate an SVG group."""
+_attribute_funs = {
+    Polygon: _polygon_attributes,
+    Spline: _spline_attributes,
+    Circle: _circle_attributes,
+    Line: _line_attributes,
+}
+
+
+def _format_numbers(values: np.ndarray, precision: int = None) -> List[str]:
+    """Write an array of numbers as a flat list of strings.
+
+    The numbers are formatted as by ``_format_number``, with rounding
+    vectorized.
+
+    """
+    values = np.asarray(values, dtype=float)
+    if precision is not None:
+        values = np.round(values, precision) + 0.0  # Adding 0.0 avoids "-0".
+    strings = map(repr, values.ravel().tolist())
+    return [x[:-2] if x.endswith(".0") else x for x in strings]
+
+
+def _array_styles(shape: ShapeArray, t: int = 0) -> List[str]:
+    """Get the compiled style of each shape in a shape array.
+
+    Element-wise style values are combined with the shared ones, and
+    each distinct combination is compiled once.
+
+    """
+    varying = {
+        prop: value
+        for prop, value in shape.style.items()
+        if isinstance(value, (list, np.ndarray))
+    }
+    if len(varying) == 0:
+        return [_write_style(shape, t)] * len(shape)
+    for values in varying.values():
+        assert len(values) == len(shape)
+    compiled = {}
+    styles = []
+    for values in zip(*varying.values()):
+        css = compiled.get(values)
+        if css is None:
+            element = dict(zip(varying.keys(), values))
+            style = {prop: element.get(prop, v) for prop, v in shape.style.items()}
+            css = _compile_style(type(shape), style, t)
+            compiled[values] = css
+        styles.append(css)
+    return styles
+
+
+def _array_elements(shape: ShapeArray, doc: "_Document") -> Iterator[Tuple[str, str]]:
+    """Generate the SVG tag and geometry attributes of each shape in an array.
+
+    Returns:
+        An iterator of (tag, attributes) tuples, with the attributes
+        formatted as in ``_write_element``.
+
+    """
+    if type(shape) is CircleArray:
+        circles = np.column_stack([shape.centers, shape.radii])
+        nums = _format_numbers(circles, doc.precision)
+        for i in range(0, len(nums), 3):
+            yield "circle", 'cx="{}" cy="{}" r="{}" '.format(*nums[i : i + 3])
+        return
+    nums = _format_numbers(shape.vertices, doc.precision)
+    offsets = (2 * shape.offsets).tolist()
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        points = " ".join(nums[start:end])
+        if type(shape) is PolygonArray:
+            yield "polygon", 'points="' + points + '" '
+        elif end - start == 4:
+            yield "line", 'x1="{}" y1="{}" x2="{}" y2="{}" '.format(*nums[start:end])
+        else:
+            yield "polyline", 'points="' + points + '" fill="none" '
+
+
+def _write_array(
+    shape: ShapeArray, doc: "_Document", mods: str, t: int = 0
+) -> Iterator[str]:
+    """Generate the SVG elements of a shape array in batches."""
+    attributes = {}
+    batch = []
+    styles = _array_styles(shape, t)
+    for css, (tag, attrs) in zip(styles, _array_elements(shape, doc)):
+        style = attributes.get(css)
+        if style is None:
+            style = doc.style_attribute(css) + mods
+            attributes[css] = style
+        batch.append("<" + tag + " " + attrs + style + "/>\n")
+        if len(batch) == 1000:
+            yield "".join(batch)
+            batch = []
+    yield "".join(batch)
+
+
+def _write_element(tag: str, attributes: dict, mods: str) -> str:
+    """Generate an SVG element with no content."""
+    if tag is None:
+        return ""
+    attrs = "".join([name + '="' + value + '" ' for name, value in attributes.items()])
+    return "<" + tag + " " + attrs + mods + "/>\n"
+
+
+def _format_number(x: float, precision: int) -> str:
+    """Write a number rounded to ``precision`` decimal places.
+
+    Trailing zeros are omitted.  If ``precision`` is None, the number
+    is written in full.
+
+    """
+    x = float(x) if precision is None else round(float(x), precision) + 0.0
+    s = repr(x)
+    return s[:-2] if s.endswith(".0") else s
+
+
+# Style values that SVG uses when a property isn't specified.
+_default_styles = {
+    "opacity": "1",
+    "fill-opacity": "1",
+    "fill-rule": "nonzero",
+    "stroke": "none",
+    "stroke-width": "1",
+    "stroke-opacity": "1",
+    "stroke-linecap": "butt",
+    "stroke-linejoin": "miter",
+    "stroke-miterlimit": "4",
+    "stroke-dasharray": "none",
+}
+
+
+def _minify_style(css: str, precision: int) -> str:
+    """Round numbers, shorten colors, and remove defaults in a style."""
+    props = []
+    for item in css.split(";"):
+        prop, _, value = item.partition(":")
+        try:
+            value = _format_number(float(value), precision)
+        except ValueError:
+            if (
+                len(value) == 7
+                and value[0] == "#"
+                and value[1] == value[2]
+                and value[3] == value[4]
+                and value[5] == value[6]
+            ):
+                value = "#" + value[1] + value[3] + value[5]
+        if _default_styles.get(prop) != value:
+            props.append(prop + ":" + value)
+    return ";".join(props)
+
+
+class _Document:
+    """State shared while writing one SVG document.
+
+    Args:
+        css_classes: Whether styles are written as CSS classes.
+        optimize: Whether to minimize the document size.
+        precision: Decimal places to round numbers to, or None.
+
+    """
+
+    def __init__(
+        self, css_classes: bool = False, optimize: bool = False, precision: int = None
+    ):
+        self.defs = {}
+        # For animated documents, the frames of each shape:
+        self.frames = None
+        self.duration = None
+        self.def_counts = {}
+        self.css_classes = css_classes
+        self.classes = {}
+        self.optimize = optimize
+        self.precision = 2 if optimize and precision is None else precision
+        self.minified = {}
+
+    def define(self, kind: str, key: Union[str, tuple]) -> Tuple[str, bool]:
+        """Get the ID of a definition such as a filter or clip path.
+
+        IDs are numbered in order of first use, so identical
+        definitions share one ID and output is deterministic.
+
+        Args:
+            kind: The type of definition, used as the ID prefix.
+            key: A hashable, canonical form of the definition.
+
+        Returns:
+            The ID, and whether the definition is new and must be
+            written.
+
+        """
+        def_id = self.defs.get((kind, key))
+        if def_id is not None:
+            return def_id, False
+        count = self.def_counts.get(kind, 0)
+        self.def_counts[kind] = count + 1
+        def_id = kind + str(count)
+        self.defs[(kind, key)] = def_id
+        return def_id, True
+
+    def num(self, x: float) -> str:
+        """Format a number for the document."""
+        return _format_number(x, self.precision)
+
+    def style_attribute(self, css: str) -> str:
+        """Get the attribute that applies a compiled style."""
+        if self.optimize:
+            minified = self.minified.get(css)
+            if minified is None:
+                minified = _minify_style(css, self.precision)
+                self.minified[css] = minified
+            css = minified
+            if css == "":
+                return ""
+        if not self.css_classes:
+            return 'style="' + css + '" '
+        name = self.classes.get(css)
+        if name is None:
+            name = "s" + str(len(self.classes))
+            self.classes[css] = name
+        return 'class="' + name + '" '
+
+    def stylesheet(self) -> str:
+        """Get the CSS rules for all classes used in the document."""
+        rules = ["." + name + "{" + css + "}\n" for css, name in self.classes.items()]
+        return "<defs>\n<style>\n" + "".join(rules) + "</style>\n</defs>\n"
+
+
+def _write_group(shape: Group, mods: str, doc: _Document, t: int = 0) -> Iterator[str]:
+    """Generate an SVG group.
+
+    A clipped group's clip path is defined immediately before it,
+    unless an identical clip path has already been defined.
+    When optimizing, groups without a clip or filter are replaced by
+    their members, and groups that are empty or whose clip is empty
+    (so nothing would be visible) are omitted.
+
+    """
+    if doc.optimize:
+        if len(flatten(shape.members)) == 0:
+            return
+        if len(shape.clip) == 0 and mods == "":
+            for o in flatten(shape.members):
+                yield from _write_shape(o, doc, t)
+            return
     output = "<g "
     if len(shape.clip) > 0:
-        clip_id = "".join(np.random.choice(list(string.ascii_letters), 8))
-        clip = '<clipPath id="' + clip_id + '">\n'
-        clip += "".join([_write_shape(o, defs, filters) for o in flatten(shape.clip)])
-        clip += "</clipPath>\n"
-        defs.append(clip)
+        clip = "".join(["".join(_write_shape(o, doc, t)) for o in flatten(shape.clip)])
+        if doc.optimize and clip == "":
+            return
+        clip_id, new = doc.define("clip", clip)
+        if new:
+            yield '<defs><clipPath id="' + clip_id + '">\n' + clip + "</clipPath></defs>\n"
         output += 'clip-path="url(#' + clip_id + ')" '
-    output += mods + ">\n"
-    output += "".join(
-        [_write_shape(o, defs, filters, t) for o in flatten(shape.members)]
-    )
-    output += "</g>\n"
-    return output
+    yield output + mods + ">\n"
+    for o in flatten(shape.members):
+        yield from _write_shape(o, doc, t)
+    yield "</g>\n"
 
 
-def _write_shape(
-    shape: dict, defs: Sequence[str], filters: Sequence[dict], t: int = 0
-) -> str:
+def _write_shape(shape: dict, doc: _Document, t: int = 0) -> Iterator[str]:
     """Generate SVG representation of a shape.
 
     Args:
         shape: A geometric shape or group.
-        defs: A list of strings used to collect SVG representations of
-          all clip paths, filters, etc.
-        filters: A collection of filter dictionaries used thus far so
-          that duplicate filters can reference the same definition.
+        doc: The state of the document being written, including the
+          definitions used thus far so that duplicate filters can
+          reference the same definition.  A filter's definition is
+          generated the first time it is used.
 
     Returns:
-        An SVG encoding.
+        An iterator of SVG fragments.
 
     """
     if type(shape) is Group and shape.filter is not None:
-        match = _match_dict(filters, shape.filter)
-        if match is None:
-            filters.append(shape.filter)
-            match = len(filters) - 1
-        filter_id = "filter" + str(match)
+        key = repr(sorted(shape.filter.items()))
+        filter_id, new = doc.define("filter", key)
+        if new:
+            yield "<defs>\n" + _write_filter(shape.filter, filter_id) + "</defs>\n"
         filter_string = 'filter="url(#' + filter_id + ')" '
     else:
         filter_string = ""
 
-    draw_funs = {
-        "<class 'algoraphics.shapes.Polygon'>": _write_polygon,
-        "<class 'algoraphics.shapes.Spline'>": _write_spline,
-        "<class 'algoraphics.shapes.Circle'>": _write_circle,
-        "<class 'algoraphics.shapes.Line'>": _write_line,
-    }
     if type(shape) is Group:
-        output = _write_group(shape, filter_string, defs, filters, t)
+        yield from _write_group(shape, filter_string, doc, t)
+    elif isinstance(shape, ShapeArray):
+        yield from _write_array(shape, doc, filter_string, t)
+    elif doc.frames is not None:
+        yield _write_animated(shape, doc, filter_string)
     else:
-        style_string = 'style="' + _write_style(shape, t) + '" '
-        mods = style_string + filter_string
-        output = draw_funs[str(type(shape))](shape, mods, t)
+        mods = doc.style_attribute(_write_style(shape, t)) + filter_string
+        tag, attributes = _attribute_funs[type(shape)](shape, doc, t)
+        yield _write_element(tag, attributes, mods)
+
+
+def _shape_frame(shape: dict, doc: _Document, t: int = 0) -> Tuple[str, dict, dict]:
+    """Evaluate a shape at a timepoint for an animated document.
+
+    Returns:
+        The SVG element name, the geometry attributes, and the style
+        properties.
+
+    """
+    css = _write_style(shape, t)
+    props = dict([prop.split(":", 1) for prop in css.split(";") if prop != ""])
+    tag, attributes = _attribute_funs[type(shape)](shape, doc, t)
+    return tag, attributes, props
+
+
+def _write_animated(shape: dict, doc: _Document, mods: str) -> str:
+    """Generate an SVG element that animates a shape's changing values.
+
+    Attributes and style properties that are the same in every frame
+    are written once.  The rest get an ``<animate>`` element that
+    steps through their values.  The element type is determined by
+    the first frame.
+
+    """
+    frames = doc.frames[id(shape)]
+    tag = frames[0][0]
+    if tag is None:
+        return ""
+    attributes = {}
+    fixed_props = []
+    animations = []
+    for i in (1, 2):  # Geometry attributes, then style properties.
+        for name, first in frames[0][i].items():
+            values = [frame[i].get(name, first) for frame in frames]
+            if values.count(first) == len(values):
+                if i == 1:
+                    attributes[name] = first
+                else:
+                    fixed_props.append(name + ":" + first)
+                continue
+            # Changing style properties become presentation attributes
+            # so they aren't overridden by the style attribute.
+            attributes[name] = first
+            animations.append(
+                '<animate attributeName="{}" values="{}" dur="{}s" '
+                'calcMode="discrete" repeatCount="indefinite" />\n'.format(
+                    name, ";".join(values), doc.duration
+                )
+            )
+    if len(fixed_props) > 0:
+        mods = doc.style_attribute(";".join(fixed_props)) + mods
+    element = _write_element(tag, attributes, mods)
+    if len(animations) == 0:
+        return element
+    return element[:-3] + ">\n" + "".join(animations) + "</" + tag + ">\n"
+
+
+def _animation_frames(
+    objects: Union[list, dict], doc: _Document, n_frames: int, t: int = 0
+) -> dict:
+    """Evaluate every shape at each timepoint of an animation.
+
+    The values of changing Params are computed for chunks of frames
+    at once, as for a frame-by-frame rendering (see ``_precomputed``).
+    All shapes are evaluated at one timepoint before moving on to the
+    next, in the same order as when writing a single frame.  Static
+    shapes are evaluated for the first frame only, so they're written
+    as plain elements.
+
+    Returns:
+        A dict mapping the ``id`` of each shape to its list of frames
+        (see ``_shape_frame``).
+
+    """
+    shapes = []
+
+    def add_shapes(objs):
+        for obj in flatten(objs):
+            if type(obj) is Group:
+                add_shapes(obj.clip)
+                add_shapes(obj.members)
+            elif not isinstance(obj, ShapeArray):  # These are static.
+                shapes.append(obj)
+
+    add_shapes(objects)
+    dynamic = [shape for shape in shapes if not is_static(shape)]
+    frames = {id(shape): [] for shape in shapes}
+    for i, time in enumerate(_precomputed(dynamic, t, t + n_frames)):
+        for shape in shapes if i == 0 else dynamic:
+            frame = frames[id(shape)]
+            if len(frame) == i:  # Shapes can appear more than once.
+                frame.append(_shape_frame(shape, doc, time))
+    return frames
+
+
+class _StyleCache:
+    """Compiled styles whose values are all strings and numbers.
+
+    Styles are looked up by shape type, style items, and value types
+    (so that 1, 1.0, and True differ), and other styles are compiled
+    every time.  The cache is cleared when it is full.  If fewer than
+    half the lookups since it was last cleared found a style, styles
+    are then compiled without it for a while (twice as long each
+    consecutive time, up to a limit), because mostly distinct styles
+    cost more to look up than they save.
+
+    """
 
-    return output
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.styles = {}
+        self.hits = 0
+        self.skip = 0
+        self.backoff = 1
+
+    def get(self, shape_type: type, style: dict, t: int = 0) -> str:
+        """Get a compiled style (see ``_compile_style``)."""
+        if self.skip > 0:
+            self.skip -= 1
+            return _compile_style(shape_type, style, t)
+        types = tuple(map(type, style.values()))
+        if not _plain_types.issuperset(types):
+            return _compile_style(shape_type, style, t)
+        key = (shape_type, tuple(style.items()), types)
+        css = self.styles.get(key)
+        if css is not None:
+            self.hits += 1
+            return css
+        if len(self.styles) >= self.limit:
+            if self.hits < self.limit:
+                self.skip = self.limit * self.backoff
+                self.backoff = min(2 * self.backoff, 64)
+            else:
+                self.backoff = 1
+            self.styles.clear()
+            self.hits = 0
+        css = _compile_style(shape_type, style)
+        self.styles[key] = css
+        return css
+
+
+_plain_styles = _StyleCache(10000)
+_plain_types = {str, int, float}
+_filled_types = {Polygon, Spline, Circle, PolygonArray, CircleArray}
 
 
 def _write_style(shape: dict, t: int = 0) -> str:
     """Generate an SVG representation of a shape's style.
 
+    Styles whose values are all strings and numbers are compiled once
+    and reused, both for later frames and for other shapes with
+    identical styles (see ``_StyleCache``).  Other styles are
+    evaluated every time.
+
     Args:
         shape: A geometric shape or group.
 
@@ -326,23 +1561,37 @@ def _write_style(shape: dict, t: int = 0) -> str:
         style="...".
 
     """
-    style = shape.style.copy()  # Keep input dict intact for reuse.
-    if type(shape) in (Polygon, Spline, Circle) and "fill" not in style:
+    return _plain_styles.get(type(shape), shape.style, t)
+
+
+def _compile_style(shape_type: type, style: dict, t: int = 0) -> str:
+    """Evaluate a style at a timepoint to get its SVG encoding.
+
+    Args:
+        shape_type: The type of shape with the style.
+        style: The style, such as a shape's own or that of one shape
+          in a shape array.
+        t: The timepoint.
+
+    """
+    # Keep input dict intact for reuse.
+    style = style.copy()
+    if shape_type in _filled_types and "fill" not in style:
         style["fill"] = "none"
         if "stroke" not in style:
             style["stroke"] = "black"
-    if type(shape) is Line and "stroke" not in style:
+    if shape_type in (Line, LineArray) and "stroke" not in style:
         style["stroke"] = "black"
     if "fill" in style and type(style["fill"]) is tuple:
         # RGB = Color(hsl=style["fill"]).RGB()
         # style["fill"] = "rgb(" + ", ".join([str(x) for x in RGB]) + ")"
-        style["fill"] = Color(*style["fill"]).state()
+        style["fill"] = Color(*style["fill"]).state(t)
     # elif "fill" in style and type(style["fill"]) is Color:
     #     style["fill"] = style["fill"].hex()
     if "stroke" in style and type(style["stroke"]) is tuple:
         # RGB = Color(hsl=style["stroke"]).RGB()
         # style["stroke"] = "rgb(" + ", ".join([str(x) for x in RGB]) + ")"
-        style["stroke"] = Color(*style["stroke"]).state()
+        style["stroke"] = Color(*style["stroke"]).state(t)
     # elif "stroke" in style and type(style["stroke"]) is Color:
     #     style["stroke"] = style["stroke"].hex()
     if "stroke" in style and style["stroke"] == "match":
@@ -366,78 +1615,277 @@ def _write_style(shape: dict, t: int = 0) -> str:
     return ";".join([prop + ":" + str(value) for prop, value in style.items()])
 
 
-def _write_filters(filters: Sequence[dict]) -> str:
-    """Generate an SVG representation of all filters used in a graphic.
+def _write_filter(fltr: dict, filter_id: str) -> str:
+    """Generate an SVG representation of a filter.
 
     Args:
-        filters: A list of filters.
+        fltr: A filter.
+        filter_id: The filter's ID.
 
     Returns:
         An SVG encoding.
 
     """
-    fltrs = []
-    for i, fltr in enumerate(filters):
-        if fltr["type"] == "shadow":
-            f = '<filter id="filter' + str(i) + '" '
-            f += 'x="-50%" y="-50%" width="200%" height="200%">\n'
-            f += '<feGaussianBlur in="SourceAlpha" '
-            f += 'stdDeviation="' + str(fltr["stdev"]) + '" result="blur" />\n'
-            f += (
-                '<feFlood flood-color="black" flood-opacity="'
-                + str(fltr["darkness"])
-                + '" />\n'
-            )
-            f += '<feComposite in2="blur" operator="in" />\n'
-            f += (
-                "<feMerge>"
-                + '<feMergeNode /><feMergeNode in="SourceGraphic" />'
-                + "</feMerge>\n"
-            )
-            f += "</filter>\n"
-        fltrs.append(f)
-    return fltrs
+    if fltr["type"] == "shadow":
+        f = '<filter id="' + filter_id + '" '
+        f += 'x="-50%" y="-50%" width="200%" height="200%">\n'
+        f += '<feGaussianBlur in="SourceAlpha" '
+        f += 'stdDeviation="' + str(fltr["stdev"]) + '" result="blur" />\n'
+        f += (
+            '<feFlood flood-color="black" flood-opacity="'
+            + str(fltr["darkness"])
+            + '" />\n'
+        )
+        f += '<feComposite in2="blur" operator="in" />\n'
+        f += (
+            "<feMerge>"
+            + '<feMergeNode /><feMergeNode in="SourceGraphic" />'
+            + "</feMerge>\n"
+        )
+        f += "</filter>\n"
+    return f
+
+
+def svg_fragments(
+    objects: Union[list, dict],
+    w: float,
+    h: float,
+    t: int = 0,
+    css_classes: bool = False,
+    optimize: bool = False,
+    precision: int = None,
+) -> Iterator[str]:
+    """Generate the SVG representation of objects in pieces.
+
+    The document is produced incrementally while walking the objects,
+    so it never has to be held in memory all at once.  Definitions
+    like filters and clip paths are placed just before their first
+    use.
+
+    Args:
+        objects: A (nested) collection of objects.  They are placed
+          onto the canvas in order after flattening.
+        w: Width of the canvas.
+        h: Height of the canvas.
+        t: If objects are dynamic, the timepoint to render.
+        css_classes: Whether to define each distinct style once as a
+          CSS class, rather than repeating it inline for every shape.
+          The stylesheet is written at the end of the document.
+        optimize: Whether to minimize the size of the document, similar
+          to svgo, as it is generated.  Numbers are rounded, default
+          style values and unnecessary whitespace are dropped, colors
+          are shortened, and redundant or invisible groups are
+          removed.
+        precision: The number of decimal places to round numbers to.
+          If None, numbers are written in full, unless ``optimize`` is
+          True, in which case 2 is used.
 
+    Returns:
+        An iterator of strings that together form an SVG document.
 
-def svg_string(objects: Union[list, dict], w: float, h: float, t: int = 0):
-    """Create an SVG string for a collection of objects.
+    """
+    doc = _Document(css_classes, optimize, precision)
+    fragments = _document_fragments(objects, _header(w, h, optimize), doc, t)
+    if optimize:
+        fragments = _compact(fragments)
+    yield from fragments
+
+
+def animated_svg_fragments(
+    objects: Union[list, dict],
+    w: float,
+    h: float,
+    fps: float,
+    n_frames: int,
+    t: int = 0,
+    css_classes: bool = False,
+    optimize: bool = False,
+    precision: int = None,
+) -> Iterator[str]:
+    """Generate an animated SVG representation of objects in pieces.
+
+    Every shape is evaluated at each timepoint before anything is
+    written.  Values that change between frames are animated with
+    SMIL ``<animate>`` elements that loop through them, while
+    everything else is written once.
 
     Args:
         objects: A (nested) collection of objects.  They are placed
           onto the canvas in order after flattening.
         w: Width of the canvas.
         h: Height of the canvas.
-        t: If objects are dynamic, the timepoint to render.
+        fps: Frames per second of the animation.
+        n_frames: Number of frames in the animation.
+        t: The timepoint of the first frame.
+        css_classes: Whether to define each distinct style once as a
+          CSS class, rather than repeating it inline for every shape.
+        optimize: Whether to minimize the size of the document (see
+          ``svg_fragments``).
+        precision: The number of decimal places to round numbers to.
+          If None, numbers are written in full, unless ``optimize`` is
+          True, in which case 2 is used.
+
+    Returns:
+        An iterator of strings that together form an SVG document.
+
+    """
+    doc = _Document(css_classes, optimize, precision)
+    doc.frames = _animation_frames(objects, doc, n_frames, t)
+    doc.duration = _format_number(n_frames / fps, 6)
+    fragments = _document_fragments(objects, _header(w, h, optimize), doc, t)
+    if optimize:
+        fragments = _compact(fragments)
+    yield from fragments
+
+
+def _header(
+    w: float, h: float, optimize: bool = False, view: Bounds = None, canvas_h: float = None
+) -> str:
+    """Generate the opening tags of an SVG document.
+
+    Args:
+        w: Width of the document.
+        h: Height of the document.
+        optimize: Whether to omit optional attributes.
+        view: The x, y, width, and height of the part of the canvas to
+          show, with y counted from the top, if not the whole canvas.
+        canvas_h: Height of the canvas, if ``view`` is given.
 
     """
-    defs = []
-    filters = []
-    out = '<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
-    out += 'xmlns:xlink="http://www.w3.org/1999/xlink" '
-    out += 'width="{}" height="{}">\n'.format(w, h)
+    if optimize:
+        out = '<svg xmlns="http://www.w3.org/2000/svg" '
+    else:
+        out = '<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+        out += 'xmlns:xlink="http://www.w3.org/1999/xlink" '
+    out += 'width="{}" height="{}"'.format(w, h)
+    if view is not None:
+        out += ' viewBox="{}"'.format(" ".join([_format_number(x, 6) for x in view]))
+        h = canvas_h
+    out += ">\n"
 
     # # flip y-axis so zero is at the bottom:
     # scale_shapes(objects, 1, -1)
     # translate_shapes(objects, 0, h)
 
-    objects = "".join(
-        [_write_shape(obj, defs, filters, t) for obj in flatten(objects)]
-    )
-
-    defs.extend(_write_filters(filters))
-    out += "<defs>\n" + "".join(defs) + "</defs>\n"
-
     out += '<g transform="translate(0, {}) scale(1, -1)">\n'.format(h)
-    out += objects + "</g>\n</svg>\n"
     return out
 
 
+def _document_fragments(
+    objects: Union[list, dict], header: str, doc: _Document, t: int = 0
+) -> Iterator[str]:
+    """Generate the pieces of an SVG document after its header."""
+    yield header
+    for obj in flatten(objects):
+        yield from _write_shape(obj, doc, t)
+    yield "</g>\n"
+    if doc.css_classes:
+        yield doc.stylesheet()
+    yield "</svg>\n"
+
+
+def _compact(fragments: Iterable[str]) -> Iterator[str]:
+    """Remove unnecessary whitespace from SVG fragments."""
+    for fragment in fragments:
+        yield fragment.replace(" />", "/>").replace(" >", ">").replace("\n", "")
+
+
+def svg_string(
+    objects: Union[list, dict],
+    w: float,
+    h: float,
+    t: int = 0,
+    css_classes: bool = False,
+    optimize: bool = False,
+    precision: int = None,
+) -> str:
+    """Create an SVG string for a collection of objects.
+
+    Args:
+        objects: A (nested) collection of objects.  They are placed
+          onto the canvas in order after flattening.
+        w: Width of the canvas.
+        h: Height of the canvas.
+        t: If objects are dynamic, the timepoint to render.
+        css_classes: Whether to define each distinct style once as a
+          CSS class, rather than repeating it inline for every shape.
+        optimize: Whether to minimize the size of the document.
+        precision: The number of decimal places to round numbers to.
+          If None, numbers are written in full, unless ``optimize`` is
+          True, in which case 2 is used.
+
+    """
+    return "".join(svg_fragments(objects, w, h, t, css_classes, optimize, precision))
+
+
+def write_svg(
+    objects: Union[list, dict],
+    file: Union[str, IO],
+    w: float,
+    h: float,
+    t: int = 0,
+    compress: bool = None,
+    css_classes: bool = False,
+    optimize: bool = False,
+    precision: int = None,
+):
+    """Write the SVG representation of objects to a file.
+
+    The document is written as it is generated rather than being
+    built in memory first.
+
+    Args:
+        objects: A (nested) collection of objects.  They are placed
+          onto the canvas in order after flattening.
+        file: A file name or file object.  File objects must be
+          opened in binary mode if ``compress`` is True, and text
+          mode otherwise.
+        w: Width of the canvas.
+        h: Height of the canvas.
+        t: If objects are dynamic, the timepoint to render.
+        compress: Whether to gzip the output (i.e. write SVGZ).  If
+          None, output is compressed if the file name ends with
+          '.svgz'.
+        css_classes: Whether to define each distinct style once as a
+          CSS class, rather than repeating it inline for every shape.
+        optimize: Whether to minimize the size of the document.
+        precision: The number of decimal places to round numbers to.
+          If None, numbers are written in full, unless ``optimize`` is
+          True, in which case 2 is used.
+
+    """
+    if compress is None:
+        compress = isinstance(file, str) and file.lower().endswith(".svgz")
+    fragments = svg_fragments(objects, w, h, t, css_classes, optimize, precision)
+    _write_text(fragments, file, compress)
+
+
+def _write_text(fragments: Iterable[str], file: Union[str, IO], compress: bool):
+    """Write strings to a file name or file object, optionally gzipped."""
+    if isinstance(file, str):
+        if compress:
+            f = gzip.open(file, "wt", encoding="utf-8")
+        else:
+            f = open(file, "w", encoding="utf-8")
+        with f:
+            f.writelines(fragments)
+    elif compress:
+        with gzip.GzipFile(fileobj=file, mode="wb") as gz:
+            text = io.TextIOWrapper(gz, encoding="utf-8")
+            text.writelines(fragments)
+            text.flush()
+            text.detach()
+    else:
+        file.writelines(fragments)
+
+
 def gif(
     function: Callable,
     fps: int,
     file_name: str,
     n_frames: int = None,
     seconds: float = None,
+    workers: int = 1,
 ):
     """Create a GIF image from a frame-generating function.
 
@@ -453,12 +1901,13 @@ def gif(
         n_frames: Number of frames to generate.
         seconds: Specify length of the GIF in seconds instead of
           number of frames.
+        workers: Number of processes used to rasterize frames.  If
+          None, the number of CPUs is used.
 
     """
     if n_frames is None:
-        n_frames = seconds * fps
-    files = _write_frames(function, n_frames, fps)
-    ImageSequenceClip(files, fps=fps).write_gif(file_name, logger=None)
+        n_frames = int(round(seconds * fps))
+    _encode_frames(_function_frames(function, n_frames, workers), file_name, fps)
 
 
 def video(
@@ -467,24 +1916,26 @@ def video(
     file_name: str,
     n_frames: int = None,
     seconds: float = None,
+    workers: int = 1,
 ):
-    """Create a GIF image from a frame-generating function.
+    """Create a video from a frame-generating function.
 
     By wrapping typical canvas drawing code in a function, multiple
     versions of the drawing, each with random variation, can be
-    stitched together into an animated GIF.
+    stitched together into a video.
 
     Args:
         function: A function called with no arguments that returns a
           (filled) Canvas.
-        fps: Frames per second of the GIF.
+        fps: Frames per second of the video.
         file_name: The file name to write to.
         n_frames: Number of frames to generate.
-        seconds: Specify length of the GIF in seconds instead of
+        seconds: Specify length of the video in seconds instead of
           number of frames.
+        workers: Number of processes used to rasterize frames.  If
+          None, the number of CPUs is used.
 
     """
     if n_frames is None:
-        n_frames = seconds * fps
-    files = _write_frames(function, n_frames, fps)
-    ImageSequenceClip(files, fps=fps).write_videofile(file_name, logger=None)
+        n_frames = int(round(seconds * fps))
+    _encode_frames(_function_frames(function, n_frames, workers), file_name, fps)
@@ -0,0 +1,203 @@
+"""
+bench_core.py
+=============
+Benchmark SVG generation and parameter evaluation at increasing
+scales.
+
+"""
+
+import numpy as np
+
+import algoraphics as ag
+
+
+def _shapes(n: int) -> list:
+    """Create a mix of styled shapes with random parameters."""
+    color = ag.Color(hue=ag.Uniform(0, 1), sat=0.8, li=ag.Uniform(0.3, 0.7))
+    circles = ag.Circle(
+        c=ag.Point((ag.Uniform(0, 400), ag.Uniform(0, 400))), r=ag.Uniform(2, 10)
+    ) * (n // 3)
+    polygons = [
+        ag.Polygon(points=[tuple(p) for p in np.random.uniform(0, 400, (5, 2))])
+        for i in range(n // 3)
+    ]
+    splines = [
+        ag.Spline(points=[tuple(p) for p in np.random.uniform(0, 400, (6, 2))])
+        for i in range(n - 2 * (n // 3))
+    ]
+    shapes = circles + polygons + splines
+    ag.set_styles(shapes, "fill", color)
+    return shapes
+
+
+class SVGString:
+    params = ([100, 1000, 10000], [False, True])
+    param_names = ["n_shapes", "optimize"]
+
+    def setup(self, n, optimize):
+        np.random.seed(0)
+        self.shapes = _shapes(n)
+        # Evaluate random parameters so only writing is timed.
+        ag.svg_string(self.shapes, 400, 400)
+
+    def time_svg_string(self, n, optimize):
+        ag.svg_string(self.shapes, 400, 400, optimize=optimize)
+
+
+class ShapeArraySVG:
+    params = [1000, 10000, 100000]
+    param_names = ["n_shapes"]
+
+    def setup(self, n):
+        np.random.seed(0)
+        colors = np.random.choice(["red", "orange", "gold"], n)
+        self.circles = ag.CircleArray(
+            np.random.uniform(0, 400, (n, 2)), np.random.uniform(2, 10, n), fill=colors
+        )
+        self.polygons = ag.PolygonArray(
+            np.random.uniform(0, 400, (5 * n, 2)), np.arange(0, 5 * n + 1, 5)
+        )
+
+    def time_circle_array(self, n):
+        ag.svg_string(self.circles, 400, 400, optimize=True)
+
+    def time_polygon_array(self, n):
+        ag.svg_string(self.polygons, 400, 400, optimize=True)
+
+
+def _param_tree(depth: int) -> ag.Param:
+    x = ag.Dynamic(0, delta=ag.Uniform(-1, 1, static=False))
+    for i in range(depth):
+        walk = ag.Dynamic(
+            ag.Uniform(0, 1),
+            delta=ag.Dynamic(0, delta=ag.Normal(0, 0.1, static=False)),
+            min=0,
+            max=10,
+        )
+        x = (x + walk) * ag.Uniform(0.9, 1.1, static=False) - i
+    return x
+
+
+class ParamTree:
+    params = ([1, 4, 16], [10, 100, 1000])
+    param_names = ["depth", "n_frames"]
+
+    def setup(self, depth, n_frames):
+        np.random.seed(0)
+        self.x = _param_tree(depth)
+        # Timing runs repeat without setup, and frames must be consecutive.
+        self.t = 0
+
+    def time_state(self, depth, n_frames):
+        for t in range(self.t, self.t + n_frames):
+            self.x.state(t)
+        self.t += n_frames
+
+
+class ParamSeries:
+    params = ([1, 4, 16], [10, 100, 1000])
+    param_names = ["depth", "n_frames"]
+    # Walks keep checkpoints, so each timing needs a fresh tree.
+    number = 1
+
+    def setup(self, depth, n_frames):
+        np.random.seed(0)
+        self.x = _param_tree(depth)
+
+    def time_series(self, depth, n_frames):
+        self.x.series(n_frames)
+
+    def time_seek(self, depth, n_frames):
+        self.x.state(n_frames)
+
+
+class BoundedWalk:
+    params = [100, 1000, 10000]
+    param_names = ["n_frames"]
+    number = 1
+
+    def setup(self, n_frames):
+        np.random.seed(0)
+        self.x = ag.Dynamic(0, delta=ag.Normal(0, 1, static=False), min=-10, max=10)
+
+    def time_series(self, n_frames):
+        self.x.series(n_frames)
+
+
+class ChangingShapes:
+    params = [1000, 20000]
+    param_names = ["n_shapes"]
+    # Params get their keys when first evaluated, so each timing needs
+    # fresh shapes.
+    number = 1
+
+    def setup(self, n):
+        np.random.seed(0)
+        self.shapes = [
+            ag.Circle(
+                (ag.Uniform(0, 400, static=False), ag.Uniform(0, 400, static=False)),
+                ag.Uniform(2, 10, static=False),
+            )
+            for i in range(n)
+        ]
+
+    def time_first_frame(self, n):
+        ag.svg_string(self.shapes, 400, 400)
+
+    def peakmem_first_frame(self, n):
+        ag.svg_string(self.shapes, 400, 400)
+
+
+class AnimatedSVG:
+    params = [10, 100]
+    param_names = ["n_frames"]
+
+    def setup(self, n_frames):
+        np.random.seed(0)
+        self.shapes = ag.Circle(
+            c=ag.Move(
+                (ag.Uniform(0, 400), ag.Uniform(0, 400)),
+                direction=ag.Uniform(0, 360),
+                distance=ag.Dynamic(0, delta=ag.Uniform(0, 1, static=False)),
+            ),
+            r=ag.Uniform(2, 10),
+        ) * 100
+        self.t = 0
+
+    def time_animated_svg_fragments(self, n_frames):
+        fragments = ag.animated_svg_fragments(
+            self.shapes, 400, 400, 10, n_frames, t=self.t
+        )
+        for fragment in fragments:
+            pass
+        self.t += n_frames
+
+
+class InterleavedFrames:
+    params = [100, 1000]
+    param_names = ["n_shapes"]
+    number = 1
+
+    def setup(self, n):
+        np.random.seed(0)
+        # Every other circle changes size, so static and dynamic
+        # objects alternate in drawing order.
+        self.canvas = ag.Canvas(400, 400)
+        self.canvas.add(
+            [
+                ag.Circle(
+                    (ag.Uniform(0, 400), ag.Uniform(0, 400)),
+                    ag.Uniform(2, 10, static=i % 2 == 0),
+                    fill="teal",
+                )
+                for i in range(n)
+            ]
+        )
+
+    def time_layered_frames(self, n):
+        for frame in self.canvas._layered_frames(10):
+            pass
+
+    def time_whole_frames(self, n):
+        for frame in ag.svg._frame_arrays(self.canvas._frame_svgs(10)):
+            pass
@@ -0,0 +1,127 @@
+"""
+bench_extras.py
+===============
+Benchmark the pattern generators in ``algoraphics.extras`` at
+increasing scales.
+
+"""
+
+import os
+import numpy as np
+
+import algoraphics as ag
+import algoraphics.extras as ex
+
+_image_path = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "tests", "test_images.jpg"
+)
+
+
+def _spot(bounds):
+    """Generate a random circle within bounds for region filling."""
+    x = np.random.uniform(bounds[0], bounds[2])
+    y = np.random.uniform(bounds[1], bounds[3])
+    return ag.Circle(c=(x, y), r=np.random.uniform(5, 15))
+
+
+def _doodles() -> list:
+    square = ex.Doodle(lambda: ag.rectangle(start=(0.1, 0.1), w=0.8, h=0.8), [[True]])
+    bar = ex.Doodle(
+        lambda: ag.rectangle(start=(0.1, 0.1), w=1.8, h=0.8), [[True, True]]
+    )
+    tee = ex.Doodle(
+        lambda: [
+            ag.rectangle(start=(0.2, 1.2), w=2.6, h=0.6),
+            ag.rectangle(start=(1.2, 0.2), w=0.6, h=1.6),
+        ],
+        [[True, True, True], [False, True, False]],
+    )
+    return [square, bar, tee]
+
+
+class SpacedPoints:
+    params = [100, 1000, 5000]
+    param_names = ["n"]
+
+    def setup(self, n):
+        np.random.seed(0)
+
+    def time_spaced_points(self, n):
+        ex.spaced_points(n, (0, 0, 1000, 1000))
+
+
+class FillRegion:
+    params = [25, 50, 100]
+    param_names = ["radius"]
+
+    def setup(self, radius):
+        np.random.seed(0)
+        self.outline = ag.Circle(c=(200, 200), r=radius)
+
+    def time_fill_region(self, radius):
+        ex.fill_region(self.outline, _spot, min_coverage=0.99)
+
+
+class RippleCanvas:
+    params = [100, 200, 400]
+    param_names = ["size"]
+
+    def setup(self, size):
+        np.random.seed(0)
+
+    def time_ripple_canvas(self, size):
+        ex.ripple_canvas(size, size, spacing=10)
+
+
+class GridWrappingPaper:
+    params = [10, 30, 60]
+    param_names = ["size"]
+
+    def setup(self, size):
+        np.random.seed(0)
+
+    def time_grid_wrapping_paper(self, size):
+        ex.grid_wrapping_paper(size, size, 10, (0, 0), _doodles())
+
+
+class Maze:
+    params = ([10, 20, 40], ["straight", "jagged", "pipes", "round"])
+    param_names = ["size", "style"]
+
+    def setup(self, size, style):
+        np.random.seed(0)
+        self.style = dict(
+            straight=ex.Maze_Style_Straight(rel_thickness=0.2),
+            jagged=ex.Maze_Style_Jagged(min_w=0.2, max_w=0.8),
+            pipes=ex.Maze_Style_Pipes(rel_thickness=0.6),
+            round=ex.Maze_Style_Round(rel_thickness=0.3),
+        )[style]
+
+    def time_maze(self, size, style):
+        ex.maze(size, size, 10, (0, 0), self.style)
+
+
+class ImageRegions:
+    # The test image is 400 pixels wide, and resizing only shrinks it.
+    params = ([100, 200, 400], [50, 200])
+    param_names = ["width", "n_segments"]
+
+    def setup(self, width, n_segments):
+        np.random.seed(0)
+        self.image = ex.open_image(_image_path)
+        ex.resize_image(self.image, width, None)
+
+    def time_image_regions(self, width, n_segments):
+        ex.image_regions(self.image, n_segments=n_segments, smoothness=3)
+
+
+class VoronoiRegions:
+    params = [100, 1000, 10000]
+    param_names = ["n"]
+
+    def setup(self, n):
+        np.random.seed(0)
+        self.points = [tuple(p) for p in np.random.uniform(0, 1000, (n, 2))]
+
+    def time_voronoi_regions(self, n):
+        ex.voronoi_regions(self.points)
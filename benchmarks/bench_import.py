@@ -0,0 +1,45 @@
+"""
+bench_import.py
+===============
+Measure package import time, which short-lived processes pay on every
+run.  Each benchmark runs in a fresh interpreter.
+
+"""
+
+
+def timeraw_import_algoraphics():
+    return "import algoraphics"
+
+
+def timeraw_import_extras():
+    return "import algoraphics.extras"
+
+
+def timeraw_import_and_write_svg():
+    return """
+import io
+import algoraphics as ag
+c = ag.Canvas(100, 100)
+c.add(ag.Circle((50, 50), 20, fill="red"))
+c.svg(io.StringIO())
+"""
+
+
+def track_heavy_modules_imported():
+    """Count optional heavy dependencies loaded by the package import."""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, algoraphics.extras\n"
+        "heavy = ['imageio_ffmpeg', 'matplotlib', 'PIL', 'rtree', 'scipy',\n"
+        "         'shapely', 'skimage', 'concurrent.futures']\n"
+        "print(sum(m in sys.modules for m in heavy))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], stdout=subprocess.PIPE, check=True
+    )
+    return int(result.stdout)
+
+
+track_heavy_modules_imported.unit = "modules"
@@ -7,8 +7,8 @@ setup(
     packages=['algoraphics', 'algoraphics.extras'],
     install_requires=[
         'cairosvg',
+        'imageio-ffmpeg',
         'matplotlib',
-        'moviepy',
         'numpy',
         'Pillow',
         'Rtree',
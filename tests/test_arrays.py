@@ -0,0 +1,129 @@
+import os
+import numpy as np
+import algoraphics as ag
+
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+w, h = 400, 200
+
+
+def same_svg(array, shapes):
+    """Check that an array is written like the equivalent shapes."""
+    for options in (dict(), dict(optimize=True), dict(css_classes=True)):
+        svg = ag.svg_string([array], w, h, **options)
+        assert svg == ag.svg_string(shapes, w, h, **options), options
+
+
+np.random.seed(0)
+
+###########
+# Circles #
+###########
+
+centers = np.random.uniform(0, 200, (50, 2))
+radii = np.random.uniform(2, 8, 50)
+colors = np.random.choice(["red", "gold", "teal"], 50)
+
+same_svg(
+    ag.CircleArray(centers, radii, fill="blue", opacity=0.5),
+    [ag.Circle(tuple(c), r, fill="blue", opacity=0.5) for c, r in zip(centers, radii)],
+)
+
+# Element-wise styles, including strokes that match each fill:
+same_svg(
+    ag.CircleArray(centers, radii, fill=list(colors), stroke="match"),
+    [
+        ag.Circle(tuple(c), r, fill=f, stroke="match")
+        for c, r, f in zip(centers, radii, colors)
+    ],
+)
+
+# One radius for all circles:
+same_svg(
+    ag.CircleArray(centers, 3, fill=colors),
+    [ag.Circle(tuple(c), 3, fill=f) for c, f in zip(centers, colors)],
+)
+
+############
+# Polygons #
+############
+
+polygons = [
+    [(20, 20), (60, 30), (40, 70)],
+    [(120, 20), (180, 30), (150, 60), (110, 50)],
+    [(200, 100), (250.5, 110.25), (230, 180)],
+]
+
+same_svg(
+    ag.PolygonArray(polygons, fill="purple", stroke="black"),
+    [ag.Polygon(pts, fill="purple", stroke="black") for pts in polygons],
+)
+same_svg(
+    ag.PolygonArray(polygons, fill=["red", "green", "blue"], stroke="match"),
+    [
+        ag.Polygon(pts, fill=f, stroke="match")
+        for pts, f in zip(polygons, ["red", "green", "blue"])
+    ],
+)
+
+# Vertices can be given in one array with offsets:
+array = ag.PolygonArray(np.concatenate(polygons), offsets=[0, 3, 7, 10])
+same_svg(array, [ag.Polygon(pts) for pts in polygons])
+
+#########
+# Lines #
+#########
+
+lines = [[(10, 120), (90, 140)], [(100, 100), (140, 140), (190, 110)]]
+array = ag.LineArray(lines, stroke=["red", "blue"])
+ag.set_style(array, "stroke-width", [2, 4])
+shapes = [ag.Line(points=lines[0], stroke="red"), ag.Line(points=lines[1], stroke="blue")]
+ag.set_style(shapes[0], "stroke-width", 2)
+ag.set_style(shapes[1], "stroke-width", 4)
+same_svg(array, shapes)
+
+###################
+# Transformations #
+###################
+
+array = ag.PolygonArray(polygons, fill="purple")
+shapes = [ag.Polygon(pts, fill="purple") for pts in polygons]
+for x in (array, shapes):
+    ag.rotate_shapes(x, 30, pivot=(100, 100))
+    ag.translate_shapes(x, 10, -5)
+    ag.scale_shapes(x, 1.5, 0.5)
+# Transformations are applied in a different order, so compare
+# rounded coordinates.
+assert np.allclose(ag.bounding_box(array), ag.bounding_box(shapes))
+svg = ag.svg_string([array], w, h, optimize=True)
+assert svg == ag.svg_string(shapes, w, h, optimize=True)
+
+###############
+# Empty array #
+###############
+
+empty = ag.CircleArray(np.zeros((0, 2)), np.zeros(0))
+assert ag.bounding_box([ag.Circle((1, 1), 1), empty]) == (0, 0, 2, 2)
+c = ag.Canvas(w, h)
+c.add(empty)
+c.get_svg()
+
+###################
+# Changing styles #
+###################
+
+array = ag.CircleArray(centers, radii)
+changing = ag.Uniform(0, 1, static=False)
+for set_style in (ag.set_style, ag.set_styles):
+    try:
+        set_style(array, "opacity", changing)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Arrays shouldn't accept changing styles.")
+try:
+    ag.CircleArray(centers, radii, fill=ag.Color(hue=changing, sat=0.9, li=0.5))
+except ValueError:
+    pass
+else:
+    raise AssertionError("Arrays shouldn't accept changing styles.")
@@ -0,0 +1,161 @@
+import os
+import shutil
+import sys
+import numpy as np
+import algoraphics as ag
+
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+# The conversions from shapes to drawing operations don't need cairo.
+
+# Canvas coordinates have y = 0 at the bottom, as in SVG output.
+xx, yx, xy, yy, x0, y0 = ag.draw._canvas_matrix(150, scale=2)
+
+
+def to_device(x, y):
+    return xx * x + xy * y + x0, yx * x + yy * y + y0
+
+
+assert to_device(0, 0) == (0, 300)
+assert to_device(200, 150) == (400, 0)
+
+# Filter regions extend the bounding box by half its size on each
+# side, and are limited to the target surface.
+region = ag.draw._filter_region
+assert region((50, 40, 90, 60), to_device, 400, 300) == (60, 160, 220, 240)
+assert region((0, 0, 100, 100), to_device, 400, 300) == (0, 0, 300, 300)
+assert region((300, 0, 310, 10), to_device, 400, 300) is None
+
+# Compiled styles map to fill colors and stroke settings.
+line = ag.Line(points=[(0, 0), (10, 10)], stroke="red", opacity=0.5)
+ag.set_style(line, "stroke-width", 2)
+ag.set_style(line, "stroke-dasharray", "4,2")
+ag.set_style(line, "stroke-linecap", "round")
+props = ag.draw._parse_style(ag.svg._write_style(line))
+assert props["opacity"] == "0.5"
+assert ag.draw._stroke(props) == dict(
+    rgba=(1, 0, 0, 1),
+    width=2,
+    cap="round",
+    join="miter",
+    miter_limit=4,
+    dashes=[4, 2],
+)
+props = ag.draw._parse_style(ag.svg._write_style(ag.Polygon([(0, 0), (1, 0), (1, 1)])))
+assert props["fill"] == "none" and ag.draw._stroke(props)["rgba"] == (0, 0, 0, 1)
+assert ag.draw._stroke(dict(stroke="blue", **{"stroke-width": "0"})) is None
+assert ag.draw._rgba("#00ff00", 0.5) == (0, 1, 0, 0.5)
+
+# Splines are drawn as smoothly joined bezier curves through their
+# points.
+points = [(10, 140), (60, 100), (120, 130), (180, 90)]
+start, segments = ag.draw._spline_segments(points)
+assert tuple(start) == points[0]
+assert np.allclose(segments[:, 4:], points[1:])
+# Each curve leaves its start point opposite the previous curve's
+# second control point.
+assert np.allclose(segments[1:, :2] - points[1:-1], points[1:-1] - segments[:-1, 2:4])
+
+# Drawing directly with cairo should look like rasterizing the SVG.
+# Lines enclose no area, so they don't add to clip paths, as in SVG.
+circle = ag.Circle((50, 50), 30)
+lines = ag.Group(members=[ag.LineArray([[(0, 0), (1, 1)]])])
+clip = [ag.Line((0, 0), (100, 100)), circle, lines]
+assert ag.draw._clip_shapes(clip) == [circle]
+
+# SVG can't be rasterized with the direct drawing backend.
+try:
+    ag.rasterize_array(ag.svg_string([circle], 100, 100), "cairo")
+except ValueError:
+    pass
+else:
+    raise AssertionError("The cairo backend should be rejected.")
+
+try:
+    ag.draw._cairo()
+except (ImportError, OSError):
+    print("Skipping: cairo is not available.")
+    sys.exit()
+
+
+def difference(objects, backend, w=200, h=150):
+    drawn = ag.draw.draw_array(objects, w, h).astype(float)
+    svg = ag.svg_string(objects, w, h)
+    rasterized = ag.rasterize_array(svg, backend).astype(float)
+    # Anti-aliasing differs slightly between renderers, so compare the
+    # average difference.
+    return np.abs(drawn - rasterized).mean()
+
+
+np.random.seed(0)
+shapes = [
+    ag.rectangle(bounds=(-1, -1, 201, 151), fill="white"),
+    ag.Circle((50, 50), 30, fill="blue", opacity=0.5),
+    ag.Polygon([(100, 20), (180, 40), (140, 120)], fill="red", stroke="black"),
+    ag.Spline([(10, 140), (60, 100), (120, 130)], stroke="green", **{"stroke-width": 3}),
+    ag.Group(
+        members=[ag.Circle((150, 100), 40, fill="orange")],
+        clip=[ag.Circle((130, 90), 25)],
+    ),
+]
+
+arrays = [
+    ag.rectangle(bounds=(-1, -1, 201, 151), fill="white"),
+    ag.CircleArray(
+        np.random.uniform(0, 200, (50, 2)),
+        np.random.uniform(2, 8, 50),
+        fill=np.random.choice(["red", "gold", "teal"], 50),
+    ),
+    ag.PolygonArray(
+        [[(20, 20), (60, 30), (40, 70)], [(120, 20), (180, 30), (150, 60), (110, 50)]],
+        fill="purple",
+        opacity=0.7,
+    ),
+    ag.LineArray([[(10, 120), (90, 140)], [(100, 100), (140, 140), (190, 110)]]),
+]
+ag.set_style(arrays[3], "stroke-width", 4)
+ag.set_style(arrays[3], "stroke-linecap", "round")
+
+strokes = [
+    ag.rectangle(bounds=(-1, -1, 201, 151), fill="white"),
+    ag.Spline([(20, 20), (60, 120), (120, 40), (180, 130)], circular=True, fill="pink"),
+    ag.Line(points=[(20, 130), (100, 80), (180, 130)], stroke="navy"),
+]
+ag.set_style(strokes[1], "stroke", "black")
+ag.set_style(strokes[2], "stroke-width", 5)
+ag.set_style(strokes[2], "stroke-dasharray", "10,5")
+ag.set_style(strokes[2], "stroke-linejoin", "round")
+ag.rotate_shapes(strokes[1:], 20, pivot=(100, 75))
+
+try:
+    import cairosvg
+except (ImportError, OSError):
+    print("Skipping cairosvg comparison: cairosvg is not available.")
+else:
+    for scene in (shapes, arrays, strokes):
+        assert difference(scene, "cairosvg") < 2
+
+# cairosvg doesn't support blur filters, so shadows are compared with
+# ImageMagick's rendering.
+shadowed = shapes[:1] + [
+    ag.with_shadow(shapes[1:3], stdev=4, darkness=0.5),
+    ag.Group(
+        members=[ag.Circle((150, 100), 40, fill="orange")],
+        clip=[ag.Circle((130, 90), 25)],
+        filter=dict(type="shadow", stdev=3, darkness=0.8),
+    ),
+]
+if shutil.which("convert") is None:
+    print("Skipping shadow comparison: ImageMagick is not available.")
+else:
+    assert difference(shadowed, "convert") < 3
+
+# Shadow darkness is limited to 1, as SVG renderers limit the
+# flood-opacity it is written as.
+darkest = [
+    ag.with_shadow(ag.Circle((100, 75), 30, fill="blue"), stdev=4, darkness=d)
+    for d in (1, 3)
+]
+assert np.array_equal(
+    ag.draw.draw_array(darkest[:1], 200, 150), ag.draw.draw_array(darkest[1:], 200, 150)
+)
@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import algoraphics as ag
 
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
@@ -6,6 +7,84 @@ os.chdir(os.path.dirname(os.path.abspath(__file__)))
 w, h = 400, 200
 c = ag.Canvas(w, h)
 
+############
+# Sampling #
+############
+
+# A Param used more than once in an expression has the same values.
+p = ag.Uniform(0, 1)
+assert np.all((p - p).sample(100) == 0)
+assert np.all((p / p).sample(100) == 1)
+
+# Copies of a shape are evaluated independently, but a Param used
+# more than once in a shape is still shared within each copy.
+p = ag.Uniform(0, 100)
+x = 100 * ag.Circle(c=(p, p), r=ag.Uniform(1, 10), fill=ag.Color(hue=p / 100, sat=0.9, li=0.5))
+assert len(set(circle.r.state(0) for circle in x)) == 100
+assert all(circle.c.state(0)[0] == circle.c.state(0)[1] for circle in x)
+ag.set_style(x[0], "fill", "red")
+assert isinstance(x[1].style["fill"], ag.Color)
+
+##########
+# Series #
+##########
+
+
+def walk():
+    delta = ag.Dynamic(0, ag.Uniform(-0.5, 0.5, static=False), min=-2, max=2)
+    return ag.Dynamic(ag.Uniform(0, 10), delta=delta, min=0, max=10)
+
+
+# Precomputed values are those given by evaluating each timepoint,
+# including for walks that are clipped at their limits.
+for make in (walk, lambda: ag.Clip(walk() * 2 + ag.Normal(0, 1, static=False), 3, 15)):
+    np.random.seed(1)
+    series = make().series(200)
+    np.random.seed(1)
+    x = make()
+    assert np.allclose(series, [x.state(t) for t in range(200)])
+
+############################
+# Random-access timepoints #
+############################
+
+# Timepoints can be evaluated in any order with the same results.
+np.random.seed(2)
+x = walk()
+values = [x.state(t) for t in range(200)]
+np.random.seed(2)
+x = walk()
+for t in (150, 20, 199, 0, 75, 74):
+    assert x.state(t) == values[t]
+
+# Restoring a snapshot gives the same values as continuing from it.
+x = walk()
+for t in range(100):
+    x.state(t)
+state = ag.snapshot(x)
+values = [x.state(t) for t in range(100, 200)] + [np.random.uniform()]
+x.state(10)
+ag.restore(x, state)
+assert [x.state(t) for t in range(100, 200)] + [np.random.uniform()] == values
+
+# Snapshots can be restored into a copy built the same way.
+np.random.seed(3)
+y = walk()
+ag.restore(y, state)
+assert [y.state(t) for t in range(100, 200)] == values[:-1]
+
+#################
+# Static layers #
+#################
+
+# Animations rasterize the static objects drawn before and after all
+# changing ones once.  Static objects between changing ones are
+# rendered with them, so frames need at most three layers.
+x = [ag.Circle((20 * i, 100), ag.Uniform(5, 10, static=i % 2 == 0)) for i in range(20)]
+bands = ag.svg._layer_bands([ag.rectangle(bounds=(0, 0, w, h))] + x)
+assert [(static, len(objects)) for static, objects in bands] == [(True, 2), (False, 19)]
+assert len(ag.svg._layer_bands([x[0], x[1:], x[0]])) == 3
+
 #############
 # Circles 1 #
 #############
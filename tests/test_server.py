@@ -0,0 +1,43 @@
+import os
+import tempfile
+import threading
+import algoraphics as ag
+from algoraphics.server import RenderServer, render
+
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+if __name__ == "__main__":  # Workers import this module.
+    path = os.path.join(tempfile.mkdtemp(), "algoraphics.sock")
+    with RenderServer(path, workers=1, timeout=10, max_jobs=2) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        # Scripts are run in a worker.
+        script = "canvas = ag.Canvas(100, 100)\ncanvas.add(ag.Circle((50, 50), 20))"
+        svg = render(path, script=script, format="svg").decode()
+        assert "<circle" in svg
+
+        # A scene's styles changed after its SVG was cached are drawn.
+        c = ag.Canvas(100, 100)
+        x = ag.Circle((50, 50), 20, fill="red")
+        c.add(x)
+        assert "red" in c.get_svg()
+        ag.set_style(x, "fill", "blue")
+        for i in range(3):  # Including after the worker is replaced.
+            svg = render(path, scene=c, format="svg").decode()
+            assert "blue" in svg and "red" not in svg
+
+        # Errors and timeouts are raised.
+        try:
+            render(path, script="raise ValueError('bad')", format="svg")
+        except RuntimeError as e:
+            assert "ValueError" in str(e)
+        else:
+            raise AssertionError("The error wasn't raised.")
+        try:
+            render(path, script="import time; time.sleep(5)", timeout=0.5)
+        except TimeoutError:
+            pass
+        else:
+            raise AssertionError("The timeout wasn't raised.")
+        assert "<circle" in render(path, script=script, format="svg").decode()
+        server.shutdown()
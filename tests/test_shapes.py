@@ -40,3 +40,33 @@ ex.wobble(x)
 
 c.add(x)
 c.png("png/shapes1.png")
+
+
+###############
+# Shared defs #
+###############
+
+# Identical filters and clip paths are defined once and referenced by
+# each group that uses them.
+x = [ag.with_shadow(ag.Circle((100, 100), 50), stdev=3, darkness=0.5) for i in range(3)]
+x.append(ag.with_shadow(ag.Circle((200, 100), 50), stdev=6, darkness=0.5))
+x += [
+    ag.Group(members=[ag.Circle((300, 300), 60)], clip=[ag.Circle((280, 280), 40)])
+    for i in range(3)
+]
+svg = ag.svg_string(x, 400, 400)
+assert svg.count("<filter ") == 2 and svg.count('filter="url(#') == 4
+assert svg.count("<clipPath ") == 1 and svg.count('clip-path="url(#') == 3
+
+c.new(x)
+c.png("png/shapes2.png")
+
+
+##########
+# Styles #
+##########
+
+# Compiled styles are shared between shapes with equal style values,
+# but not between values that are written differently.
+styles = [ag.svg._write_style(ag.Circle((0, 0), 1, opacity=v)) for v in (1, 1.0, 1)]
+assert styles[0] == styles[2] and styles[0] != styles[1]